@@ -0,0 +1,164 @@
+import numpy as np
+
+from prepare import month_columns, sales_metrics
+
+# ========================
+# сводные показатели по измерениям
+# ========================
+
+# Один groupby по основной таблице считает все базовые суммы и средние для
+# любого измерения (subcategory, Поставщик, category или их комбинации),
+# производные показатели затем считаются по колонкам результата.
+# Формулы повторяют сводные таблицы из выгрузки.
+
+summary_aggregations = {
+    "Кол-во продаж": ("Общее количество продаж (шт)", "sum"),
+    "Уникальные артикулы": ("Артикул", "nunique"),
+    "Товаров": ("Артикул", "count"),
+    "Сумма продаж": ("Итого продаж", "sum"),
+    "Всего потрачено на закупку": ("Закупочная цена всего", "sum"),
+    "Средняя цена за единицу": ("Средняя цена продажи", "mean"),
+    "Средняя закупочная цена": ("закупочная цена", "mean"),
+    "Среднее_изменение_цены_проц": ("Изменение цены % (recalc)", "mean"),
+    "Макс_рост_цены_грн": ("Изменение цены в гривнах (recalc)", "max"),
+    "Мин_падение_цены_грн": ("Изменение цены в гривнах (recalc)", "min"),
+}
+
+# сетка сценариев по умолчанию: повышение цен на 1..50%
+default_uplifts = tuple(range(1, 51))
+
+derived_columns = [
+    "Маржа в грн/шт",
+    "Общая прибыль",
+    "Маржа %",
+    "Markup % (Наценка)",
+    "эффективность наценки",
+    "Индекс эффективности",
+    "Доход с 1 SKU",
+    "Средняя прибыль на 1 SKU",
+]
+
+
+def summarize(df, by):
+    by = [by] if isinstance(by, str) else list(by)
+    summary = df.dropna(subset=by).groupby(by, observed=True).agg(**summary_aggregations)
+    return derive_metrics(summary)
+
+
+def sales_dynamics(df, by):
+    # динамика продаж по группам: средние показатели SKU и те же показатели,
+    # посчитанные по суммарным помесячным продажам группы
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = df.dropna(subset=by).groupby(by, observed=True)
+
+    dynamics = grouped.agg(**{
+        "Средний тренд SKU": ("Тренд продаж (recalc)", "mean"),
+        "Средняя волатильность SKU": ("Волатильность (recalc)", "mean"),
+        "Среднее число месяцев с продажами": ("Всего месяцев с продажами (recalc)", "mean"),
+    }).astype("float64")
+    group = sales_metrics(grouped[month_columns(df, "_шт")].sum()).rename(columns={
+        "Всего месяцев с продажами (recalc)": "Месяцев с продажами в группе",
+        "Тренд продаж (recalc)": "Тренд продаж группы",
+        "Волатильность (recalc)": "Волатильность группы",
+        "Месяц макс продаж (recalc)": "Месяц макс продаж группы",
+    })
+    return dynamics.round(3).join(group).reset_index()
+
+
+def derive_metrics(summary):
+    # производные показатели из базовых сумм и средних, индекс — измерение
+    # средние по float32-колонкам считаем дальше в float64
+    summary = summary.astype("float64")
+    sales = summary["Кол-во продаж"]
+    skus = summary["Уникальные артикулы"].replace(0, np.nan)
+    avg_price = summary["Средняя цена за единицу"]
+    avg_cost = summary["Средняя закупочная цена"]
+
+    margin = avg_price - avg_cost
+    summary["Маржа в грн/шт"] = margin
+    summary["Общая прибыль"] = margin * sales
+    summary["Маржа %"] = margin / avg_price * 100
+    summary["Markup % (Наценка)"] = margin / avg_cost * 100
+    summary["эффективность наценки"] = summary["Маржа %"] / summary["Markup % (Наценка)"]
+    # оборачиваемость SKU с поправкой на эффективность наценки; убыточные группы — 0
+    summary["Индекс эффективности"] = (sales / skus * summary["эффективность наценки"]).where(margin >= 0, 0.0)
+    summary["Доход с 1 SKU"] = summary["Сумма продаж"] / skus
+    summary["Средняя прибыль на 1 SKU"] = summary["Общая прибыль"] / skus
+
+    summary = summary.replace([np.inf, -np.inf], np.nan).round(2).reset_index()
+    count_columns = ["Кол-во продаж", "Уникальные артикулы", "Товаров"]
+    summary[count_columns] = summary[count_columns].astype("int64")
+    return summary
+
+
+def dimension_columns(summary):
+    return [col for col in summary.columns if col not in summary_aggregations and col not in derived_columns]
+
+
+def candidate_mask(summary, min_items=5, max_change_pct=1.0):
+    # группы, где цены почти не росли и товаров больше min_items
+    return (summary["Среднее_изменение_цены_проц"] < max_change_pct) & (summary["Товаров"] > min_items)
+
+
+def simulate_prices(summary, uplifts=default_uplifts, elasticities=(0.0,)):
+    # все сценарии сразу: группы x повышения x эластичности одним broadcast.
+    # Эластичность e <= 0: продажи в штуках меняются в (1 + u) ** e раз,
+    # e = 0 — спрос не реагирует на цену (прежний расчёт «+10%»).
+    by = dimension_columns(summary)
+    uplift_values = np.asarray(uplifts, dtype="float64")
+    elasticity_values = np.asarray(elasticities, dtype="float64")
+    groups, n_uplifts, n_elasticities = len(summary), len(uplift_values), len(elasticity_values)
+
+    factor = 1 + uplift_values[None, :, None] / 100
+    demand = factor ** elasticity_values[None, None, :]
+
+    def column(name):
+        return summary[name].to_numpy(dtype="float64")[:, None, None]
+
+    revenue, sales = column("Сумма продаж"), column("Кол-во продаж")
+    price, cost = column("Средняя цена за единицу"), column("Средняя закупочная цена")
+    shape = (groups, n_uplifts, n_elasticities)
+
+    revenue_before = np.broadcast_to(revenue, shape).round(0)
+    revenue_after = (revenue * factor * demand).round(0)
+    profit_before = np.broadcast_to(sales * (price - cost), shape).round(0)
+    profit_after = (sales * demand * (price * factor - cost)).round(0)
+
+    result = summary[by].iloc[np.repeat(np.arange(groups), n_uplifts * n_elasticities)].reset_index(drop=True)
+    result["Повышение цены %"] = np.tile(np.repeat(uplift_values, n_elasticities), groups)
+    result["Эластичность"] = np.tile(elasticity_values, groups * n_uplifts)
+    result["Средняя цена (до)"] = np.broadcast_to(price, shape).ravel()
+    result["Средняя цена (после)"] = np.broadcast_to(price * factor, shape).round(2).ravel()
+    result["Итого продаж (до)"] = revenue_before.ravel()
+    result["Итого продаж (после)"] = revenue_after.ravel()
+    result["Прирост выручки"] = (revenue_after - revenue_before).ravel()
+    result["Прибыль (до)"] = profit_before.ravel()
+    result["Прибыль (после)"] = profit_after.ravel()
+    result["Прирост прибыли"] = (profit_after - profit_before).ravel()
+    return result
+
+
+def scenario_totals(scenarios):
+    # итог по всем группам для каждой пары (повышение, эластичность)
+    return scenarios.groupby(["Повышение цены %", "Эластичность"], as_index=False)[[
+        "Итого продаж (до)", "Итого продаж (после)", "Прирост выручки",
+        "Прибыль (до)", "Прибыль (после)", "Прирост прибыли",
+    ]].sum()
+
+
+def growth_candidates(summary, min_items=5, uplift=10, max_change_pct=1.0, elasticity=0.0):
+    # кандидаты на повышение цен с оценкой выручки при повышении на uplift %
+    by = dimension_columns(summary)
+    candidates = summary[candidate_mask(summary, min_items, max_change_pct)]
+    scenario = simulate_prices(candidates, [uplift], [elasticity])
+
+    label = f"+{uplift:g}%"
+    result = candidates[by + ["Среднее_изменение_цены_проц", "Товаров"]].reset_index(drop=True)
+    result["Средняя цена (до)"] = scenario["Средняя цена (до)"]
+    result[f"Средняя цена (если {label})"] = scenario["Средняя цена (после)"]
+    result["Итого продаж (до)"] = candidates["Сумма продаж"].to_numpy()
+    result[f"Итого продаж (если {label})"] = scenario["Итого продаж (после)"]
+    result[f"Потенциал роста при {label}"] = (result[f"Итого продаж (если {label})"] - result["Итого продаж (до)"]).round(0)
+    result[f"Прирост прибыли при {label}"] = scenario["Прирост прибыли"]
+    result.index = candidates.index
+    return result.sort_values(f"Потенциал роста при {label}", ascending=False)
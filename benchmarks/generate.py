@@ -0,0 +1,127 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from prepare import lead_columns, tail_columns
+
+# ========================
+# синтетическая выгрузка для бенчмарков
+# ========================
+
+# Файл в точности в формате "Summar - Общая сводная.csv": пары колонок
+# "MM.YYYY шт" / "MM.YYYY цена" на каждый месяц, цены вида "1 234,50 грн."
+# (неразрывный пробел и десятичная запятая), поставщики и подкатегории
+# с неравномерным распределением.
+#
+#     python -m benchmarks.generate 100000 "synthetic_100k.csv"
+
+default_months = ["06.2024", "07.2024", "08.2024", "09.2024", "10.2024", "11.2024", "12.2024", "01.2025", "02.2025", "03.2025", "04.2025"]
+
+CHUNK_ROWS = 100_000
+
+
+# разделитель тысяч — неразрывный пробел перед каждой группой из трёх цифр
+THOUSANDS_PATTERN = r"\B(?=(\d{3})+$)"
+
+
+def format_price(values):
+    # "-1 234 567,50 грн." без построчного форматирования в Python
+    values = np.round(np.asarray(values, dtype="float64"), 2)
+    missing = np.isnan(values)
+    kopecks = np.rint(np.nan_to_num(values) * 100).astype("int64")
+    whole, frac = np.divmod(np.abs(kopecks), 100)
+
+    sign = np.where(kopecks < 0, "-", "")
+    units = pd.Series(whole).astype(str).str.replace(THOUSANDS_PATTERN, "\u00a0", regex=True)
+    text = sign + units + "," + pd.Series(frac).astype(str).str.zfill(2) + " грн."
+    return text.where(~missing, "").to_numpy(dtype=object)
+
+
+def _zipf_weights(n):
+    weights = 1 / np.arange(1, n + 1)
+    return weights / weights.sum()
+
+
+def _zipf_choice(rng, names, size):
+    return np.asarray(names, dtype=object)[rng.choice(len(names), size=size, p=_zipf_weights(len(names)))]
+
+
+def generate_chunk(rng, start, size, months, suppliers, subcategories, categories):
+    ids = np.arange(start, start + size)
+    base = rng.lognormal(mean=6.5, sigma=1.0, size=size)
+    subcategory_idx = rng.choice(len(subcategories), size=size, p=_zipf_weights(len(subcategories)))
+
+    columns = {
+        "Артикул": np.char.add("SKU", ids.astype(str)),
+        "Поставщик": _zipf_choice(rng, suppliers, size),
+        "title": np.char.add("Товар ", ids.astype(str)),
+        "category": np.asarray(categories, dtype=object)[subcategory_idx % len(categories)],
+        "subcategory": np.asarray(subcategories, dtype=object)[subcategory_idx],
+        "закупочная цена": format_price(base * 0.75),
+        "Средняя цена продажи": format_price(base),
+    }
+
+    # помесячно: продажа в ~35% месяцев, цена дрейфует от месяца к месяцу
+    sold = rng.random((size, len(months))) < 0.35
+    qty = np.where(sold, rng.integers(1, 12, size=(size, len(months))), 0)
+    drift = np.cumprod(rng.normal(1.005, 0.03, size=(size, len(months))), axis=1)
+    prices = np.where(sold, base[:, None] * drift, np.nan)
+    for i, m in enumerate(months):
+        columns[f"{m} шт"] = np.where(sold[:, i], qty[:, i].astype(str), "")
+        columns[f"{m} цена"] = format_price(prices[:, i])
+
+    total_qty = qty.sum(axis=1)
+    revenue = np.nansum(np.nan_to_num(prices) * qty, axis=1)
+    first = np.where(sold.any(axis=1), prices[np.arange(size), sold.argmax(axis=1)], np.nan)
+    last = np.where(sold.any(axis=1), prices[np.arange(size), len(months) - 1 - sold[:, ::-1].argmax(axis=1)], np.nan)
+    tail = {
+        "всего проданно товара": total_qty.astype(str),
+        "Закупочная цена всего": format_price(base * 0.75 * total_qty),
+        "Итого продаж": format_price(revenue),
+        "Первая цена за период": format_price(first),
+        "Последняя цена за период": format_price(last),
+        "Изменение цены в гривнах": format_price(last - first),
+        "Средняя цена за период": format_price(np.nansum(prices, axis=1) / np.where(sold.any(axis=1), sold.sum(axis=1), np.nan)),
+        "MAX / MIN цена за период": "",
+        "": "",
+        "Всего месяцев с продажами (сезонность)": sold.sum(axis=1).astype(str),
+        "Тренд продаж": "",
+        "Волатильность": "",
+        "Месяц макс продаж": np.asarray(months, dtype=object)[qty.argmax(axis=1)],
+    }
+    columns.update(tail)
+    return pd.DataFrame(columns)
+
+
+def generate_export(path, rows, months=default_months, suppliers=200, subcategories=300, categories=40, seed=0):
+    rng = np.random.default_rng(seed)
+    supplier_names = [f"Поставщик {i}" for i in range(suppliers)]
+    subcategory_names = [f"Подкатегория {i}" for i in range(subcategories)]
+    category_names = [f"Категория {i}" for i in range(categories)]
+
+    header = list(lead_columns)
+    for m in months:
+        header += [f"{m} шт", f"{m} цена"]
+    header += tail_columns
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(header)
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = generate_chunk(
+                rng, start, min(CHUNK_ROWS, rows - start), months,
+                supplier_names, subcategory_names, category_names,
+            )
+            chunk.to_csv(f, header=False, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Синтетическая выгрузка продаж")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate_export(args.path, args.rows, seed=args.seed), os.path.getsize(args.path))
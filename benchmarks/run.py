@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import plotly.express as px
+
+from aggregates import default_uplifts, growth_candidates, simulate_prices, summarize
+from benchmarks.generate import generate_export
+from facts import build_fact_tables
+from filters import build_filter_index
+from prepare import first_last_prices, month_columns, parse_number_block, prepare_main_table, read_main_csv, sales_metrics
+from ranges import build_range_index
+from search import build_search_index
+
+# ========================
+# бенчмарки по этапам
+# ========================
+
+# Для каждого размера каталога генерируется (или берётся из кэша) синтетическая
+# выгрузка, затем по очереди замеряются этапы обработки: время и пиковая
+# память каждого этапа. tracemalloc заметно замедляет код, поэтому время
+# меряется отдельным прогоном без него. Память считается по аллокациям
+# Python и numpy — буферы Arrow (строки pandas) в неё не попадают.
+#
+#     python -m benchmarks.run --sizes 10000 100000 1000000
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def measure(name, func, *args, memory=True):
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    stats = {"stage": name, "seconds": round(elapsed, 4)}
+
+    if memory:
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats["peak_mb"] = round(peak / 2**20, 1)
+    return result, stats
+
+
+def _parse_prices(df):
+    columns = month_columns(df, "_цена") + ["Итого продаж", "Средняя цена продажи", "закупочная цена", "Закупочная цена всего"]
+    return parse_number_block(df[columns])
+
+
+def _tab_groupbys(df):
+    # то, что считают вкладки 3 и 5: сводные и кандидаты на повышение цен
+    return {dim: growth_candidates(summarize(df, dim)) for dim in ("subcategory", "Поставщик")}
+
+
+def _price_scenarios(df):
+    # 50 повышений x 3 эластичности для всех подкатегорий и поставщиков
+    return [simulate_prices(summarize(df, dim), default_uplifts, (0.0, -0.5, -1.0)) for dim in ("subcategory", "Поставщик")]
+
+
+def _figures(df):
+    figures = []
+    for dim in ("subcategory", "Поставщик"):
+        grouped = summarize(df, dim).sort_values("Среднее_изменение_цены_проц", ascending=False)
+        figures.append(px.bar(grouped, x=dim, y="Среднее_изменение_цены_проц"))
+        figures.append(px.bar(grouped.head(5), x=dim, y="Среднее_изменение_цены_проц", color="Среднее_изменение_цены_проц"))
+    return figures
+
+
+def run_size(rows, data_dir=DATA_DIR, memory=True):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{rows}.csv")
+    if not os.path.exists(path):
+        generate_export(path, rows)
+
+    raw, load = measure("csv_load", read_main_csv, path, memory=memory)
+    df, prepare = measure("prepare_full", prepare_main_table, path, memory=memory)
+    stages = [
+        ("price_parsing", _parse_prices, raw),
+        ("first_last_price", first_last_prices, df[month_columns(df, "_цена")]),
+        ("sales_metrics", sales_metrics, df[month_columns(df, "_шт")]),
+        ("tab3_tab5_groupbys", _tab_groupbys, df),
+        ("price_scenarios", _price_scenarios, df),
+        ("filter_index", build_filter_index, df),
+        ("fact_tables", build_fact_tables, df),
+        ("range_index", build_range_index, df),
+        ("search_index", build_search_index, df),
+        ("figures", _figures, df),
+    ]
+    results = [load, prepare] + [measure(name, func, arg, memory=memory)[1] for name, func, arg in stages]
+
+    for result in results:
+        result["rows"] = rows
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки этапов обработки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="папка для синтетических выгрузок")
+    parser.add_argument("--json", help="сохранить результаты в JSON")
+    parser.add_argument("--no-memory", action="store_true", help="не замерять пиковую память (вдвое быстрее)")
+    args = parser.parse_args()
+
+    all_results = []
+    for rows in args.sizes:
+        for result in run_size(rows, args.data_dir, memory=not args.no_memory):
+            all_results.append(result)
+            peak = f"{result['peak_mb']:>9.1f} MB" if "peak_mb" in result else ""
+            print(f"{result['rows']:>9} {result['stage']:<20} {result['seconds']:>9.3f} s {peak}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, ensure_ascii=False, indent=2)
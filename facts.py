@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from prepare import month_columns
+
+# ========================
+# помесячная таблица фактов
+# ========================
+
+# Широкая таблица ({m}_шт / {m}_цена для каждого месяца) разворачивается в
+# длинную: одна строка на пару SKU × месяц, где была продажа или цена.
+# SKU — номер строки широкой таблицы, месяц — код из справочника месяцев.
+#
+# Это только формат загрузки в локальное хранилище (store.init_store):
+# атрибуты SKU хранилище берёт из широкой таблицы. Помесячные запросы
+# приложения идут через накопленные суммы (ranges.py), итоги групп при
+# чтении из хранилища — через его таблицу dimension_totals.
+
+
+def _smallest_int(values):
+    for dtype in ("int8", "int16", "int32"):
+        if len(values) == 0 or np.abs(values).max() <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values.astype("int64")
+
+
+def build_fact_tables(df):
+    qty_columns = month_columns(df, "_шт")
+    price_columns = month_columns(df, "_цена")
+    months = [col.removesuffix("_шт") for col in qty_columns]
+
+    qty = df[qty_columns].to_numpy(dtype="float32")
+    prices = df[price_columns].to_numpy(dtype="float32")
+    mask = ~np.isnan(qty) | ~np.isnan(prices)
+    rows, cols = np.nonzero(mask)
+
+    facts = pd.DataFrame({
+        "sku_id": rows.astype("int32"),
+        "month_id": _smallest_int(cols),
+        "quantity": qty[rows, cols],
+        "price": prices[rows, cols],
+    })
+    return {"facts": facts, "months": pd.DataFrame({"month_id": np.arange(len(months)), "month": months})}
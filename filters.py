@@ -0,0 +1,51 @@
+# ========================
+# индекс для фильтров вкладки с ценами
+# ========================
+
+# Строится один раз на версию данных: для каждой подкатегории, поставщика и
+# их пары заранее известны позиции строк, так что выбор в фильтрах — это
+# поиск в словаре и take по позициям, без масок по всей таблице и копий.
+
+
+def _group_positions(df, by):
+    # позиции строк по группам; порядок групп — как в таблице (как у unique())
+    positions = df.groupby(by, observed=True, sort=False).indices
+    return dict(sorted(positions.items(), key=lambda item: item[1][0]))
+
+
+def build_filter_index(df):
+    by_subcategory = _group_positions(df, "subcategory")
+    by_supplier = _group_positions(df, "Поставщик")
+    by_pair = _group_positions(df, ["subcategory", "Поставщик"])
+
+    suppliers = {}
+    for subcategory, supplier in by_pair:
+        suppliers.setdefault(subcategory, []).append(supplier)
+
+    return {
+        "subcategory": by_subcategory,
+        "Поставщик": by_supplier,
+        "pair": by_pair,
+        "suppliers": suppliers,
+    }
+
+
+def subcategory_options(index):
+    return list(index["subcategory"])
+
+
+def supplier_options(index, subcategory=None):
+    if subcategory is None:
+        return list(index["Поставщик"])
+    return index["suppliers"].get(subcategory, [])
+
+
+def select_positions(index, subcategory=None, supplier=None):
+    # None — фильтр не задан; без фильтров возвращается None (все строки)
+    if subcategory is not None and supplier is not None:
+        return index["pair"].get((subcategory, supplier), [])
+    if subcategory is not None:
+        return index["subcategory"].get(subcategory, [])
+    if supplier is not None:
+        return index["Поставщик"].get(supplier, [])
+    return None
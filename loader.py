@@ -0,0 +1,264 @@
+import os
+
+import streamlit as st
+
+from aggregates import sales_dynamics, summarize
+from filters import build_filter_index
+from prepare import MAIN_CSV, prepare_main_table
+from profiling import cache_miss, stage
+from ranges import build_range_index, range_dimensions
+from search import build_search_index
+from snapshot import read_snapshot, snapshot_path
+from store import STORE_PATH, read_dimension_totals, read_store_table
+from streaming import stream_aggregates
+
+# ========================
+# кэш подготовленных данных
+# ========================
+
+# Ключ кэша — путь + mtime + размер файла: пока файл не изменился, все сессии
+# получают один и тот же подготовленный df без повторного чтения и парсинга.
+# Кэшированный df общий для всех сессий — его нельзя изменять на месте.
+#
+# Если рядом лежит снапшот (python snapshot.py) не старше CSV, читается он.
+# Для основной таблицы ещё приоритетнее локальное хранилище (python store.py),
+# в которое дописываются новые месяцы; помесячные итоги групп для выбора
+# периода тогда тоже читаются из хранилища, а не считаются по строкам.
+#
+# Слишком большой CSV (или STATISTIC_STREAMING=1) не загружается целиком:
+# сводные строятся потоково по частям файла, построчные данные недоступны.
+#
+# Каждая загрузка записывается как этап профилирования (profiling.stage);
+# кэшируемые функции вызывают cache_miss(), когда их тело действительно
+# выполняется, — так в панели диагностики видно попадание в кэш.
+#
+# При фоновом обновлении (refresh.py) сессии читают только опубликованную
+# версию основной таблицы: новая версия и всё производное от неё строятся
+# в кэше заранее, а затем ключ подменяется одним присваиванием. Версия
+# записана в df.attrs["version"], и производные структуры берутся по версии
+# самого df — фрагмент, перезапущенный со старым df, не смешает версии.
+
+STREAM_THRESHOLD_MB = int(os.environ.get("STATISTIC_STREAM_THRESHOLD_MB", 1024))
+
+_loaded_versions = {}
+_published = {}
+
+# измерения, для которых вкладки строят сводные
+summary_dimensions = ("subcategory", "Поставщик")
+
+
+def file_version(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def streaming_mode():
+    if os.environ.get("STATISTIC_STREAMING") == "1":
+        return True
+    return resolve_source("main", MAIN_CSV) == MAIN_CSV and os.stat(MAIN_CSV).st_size > STREAM_THRESHOLD_MB * 2**20
+
+
+def _not_older(path, csv_path):
+    return os.path.exists(path) and (
+        not os.path.exists(csv_path) or os.stat(path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+    )
+
+
+def resolve_source(name, csv_path):
+    if name == "main" and _not_older(STORE_PATH, csv_path):
+        return STORE_PATH
+    path = snapshot_path(name)
+    if _not_older(path, csv_path):
+        return path
+    return csv_path
+
+
+def read_table(path):
+    # чтение без кэша — для запуска вне Streamlit (например, reports.py)
+    if path.endswith(".parquet"):
+        return read_snapshot(path)
+    return read_store_table(path) if path == STORE_PATH else prepare_main_table(path)
+
+
+def read_main_table():
+    return read_table(resolve_source("main", MAIN_CSV))
+
+
+@st.cache_resource(max_entries=8, show_spinner="Загрузка данных...")
+def _load_table(name, path, mtime_ns, size):
+    cache_miss()
+    df = read_table(path)
+    df.attrs["version"] = (name, path, mtime_ns, size)
+    return df
+
+
+def table_key(name, csv_path):
+    path = resolve_source(name, csv_path)
+    return (name, path, *file_version(path))
+
+
+def publish(key):
+    # одно присваивание: следующий прогон любой сессии берёт новую версию
+    _published[key[0]] = key
+
+
+def published_key(name):
+    return _published.get(name)
+
+
+def load_table(name, csv_path):
+    key = _published.get(name)
+    if key is None:
+        key = table_key(name, csv_path)
+
+        # файл обновился — выбрасываем устаревшую версию из кэша сразу,
+        # не дожидаясь вытеснения по max_entries
+        previous = _loaded_versions.get(name)
+        if previous is not None and previous != key:
+            _load_table.clear(*previous)
+        _loaded_versions[name] = key
+
+    with stage(f"load:{name}", cached=True) as record:
+        df = _load_table(*key)
+        record["rows"] = len(df)
+    return df
+
+
+def load_main_table():
+    return load_table("main", MAIN_CSV)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _summarize(key, by, _df):
+    cache_miss()
+    return summarize(_df, list(by))
+
+
+@st.cache_resource(max_entries=2, show_spinner="Потоковая обработка данных...")
+def _stream_aggregates(path, mtime_ns, size):
+    cache_miss()
+    return stream_aggregates(path)
+
+
+def stream_key():
+    return ("stream", MAIN_CSV, *file_version(MAIN_CSV))
+
+
+def load_streamed_aggregates():
+    # как и основная таблица: опубликованная наблюдателем версия, если она есть
+    key = _published.get("stream") or stream_key()
+    with stage("stream_aggregates", cached=True):
+        return _stream_aggregates(*key[1:])
+
+
+def _versioned(df=None):
+    # версия основной таблицы, с которой работает вызывающий
+    if df is None:
+        df = load_main_table()
+    return df.attrs.get("version") or table_key("main", MAIN_CSV), df
+
+
+def load_summary(by, df=None):
+    # сводная по измерению кэшируется вместе с версией основной таблицы
+    by = (by,) if isinstance(by, str) else tuple(by)
+    if streaming_mode():
+        return load_streamed_aggregates()["summaries"][by[0]]
+    key, df = _versioned(df)
+    with stage(f"summary:{'+'.join(by)}", rows=len(df), cached=True):
+        return _summarize(key, by, df)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _sales_dynamics(key, by, _df):
+    cache_miss()
+    return sales_dynamics(_df, list(by))
+
+
+def load_sales_dynamics(by, df=None):
+    # тренд, волатильность и сезонность по группам; нужна построчная таблица
+    by = (by,) if isinstance(by, str) else tuple(by)
+    key, df = _versioned(df)
+    with stage(f"sales_dynamics:{'+'.join(by)}", rows=len(df), cached=True):
+        return _sales_dynamics(key, by, df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_filter_index(key, _df):
+    cache_miss()
+    return build_filter_index(_df)
+
+
+def load_filter_index(df=None):
+    key, df = _versioned(df)
+    with stage("filter_index", rows=len(df), cached=True):
+        return _build_filter_index(key, df)
+
+
+def _store_group_totals(key):
+    # итоги групп по месяцам берутся из хранилища, если df прочитан из него
+    # и файл с тех пор не менялся
+    _, path, mtime_ns, size = key
+    if path != STORE_PATH or file_version(path) != (mtime_ns, size):
+        return None
+    return {dim: read_dimension_totals(dim, path) for dim in range_dimensions}
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_range_index(key, _df):
+    cache_miss()
+    return build_range_index(_df, _store_group_totals(key))
+
+
+def load_range_index(df=None):
+    # накопленные суммы по месяцам для выбора произвольного диапазона
+    key, df = _versioned(df)
+    with stage("range_index", rows=len(df), cached=True):
+        return _build_range_index(key, df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_search_index(key, _df):
+    cache_miss()
+    return build_search_index(_df)
+
+
+def load_search_index(df=None):
+    # словарь слов названий и артикулов для поиска в первой вкладке
+    key, df = _versioned(df)
+    with stage("search_index", rows=len(df), cached=True):
+        return _build_search_index(key, df)
+
+
+def source_key():
+    # версия источника, которую наблюдатель строит и публикует
+    return stream_key() if streaming_mode() else table_key("main", MAIN_CSV)
+
+
+def build_version(key):
+    # основная таблица версии key и всё, что нужно вкладкам, — в кэш заранее;
+    # в потоковом режиме таблицы нет, строятся только сводные
+    if key[0] == "stream":
+        return None, _stream_aggregates(*key[1:])["summaries"]
+
+    df = _load_table(*key)
+    summaries = {by: _summarize(key, (by,), df) for by in summary_dimensions}
+    if "Тренд продаж (recalc)" in df.columns:
+        for by in summary_dimensions:
+            _sales_dynamics(key, (by,), df)
+    _build_filter_index(key, df)
+    _build_range_index(key, df)
+    _build_search_index(key, df)
+    return df, summaries
+
+
+def drop_version(key):
+    if key[0] == "stream":
+        _stream_aggregates.clear(*key[1:])
+        return
+
+    _load_table.clear(*key)
+    for by in summary_dimensions:
+        _summarize.clear(key, (by,), None)
+        _sales_dynamics.clear(key, (by,), None)
+    for build in (_build_filter_index, _build_range_index, _build_search_index):
+        build.clear(key, None)
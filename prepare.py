@@ -0,0 +1,176 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from profiling import stage
+
+# ========================
+# подготовка основной таблицы
+# ========================
+
+MAIN_CSV = "Summar - Общая сводная.csv"
+
+# месяцы выгрузки по умолчанию — если в заголовке CSV не нашлось дат
+months = ["06.2024", "07.2024", "08.2024", "09.2024", "10.2024", "11.2024", "12.2024", "01.2025", "02.2025", "03.2025", "04.2025"]
+
+lead_columns = [
+    "Артикул", "Поставщик", "title", "category", "subcategory", "закупочная цена", "Средняя цена продажи"
+]
+
+tail_columns = ["всего проданно товара", "Закупочная цена всего", "Итого продаж",
+                "Первая цена за период", "Последняя цена за период", "Изменение цены в гривнах",
+                "Средняя цена за период", "MAX / MIN цена за период", "", "Всего месяцев с продажами (сезонность)",
+                "Тренд продаж", "Волатильность", "Месяц макс продаж"]
+
+category_columns = ["Поставщик", "category", "subcategory"]
+
+MONTH_PATTERN = re.compile(r"\b(\d{2}\.\d{4})\b")
+
+
+def detect_months(header):
+    found = []
+    for name in header:
+        match = MONTH_PATTERN.search(str(name))
+        if match and match.group(1) not in found:
+            found.append(match.group(1))
+    if not found:
+        return list(months)
+
+    expected = len(lead_columns) + 2 * len(found) + len(tail_columns)
+    if len(header) != expected:
+        raise ValueError(
+            f"Ожидалось {expected} колонок для {len(found)} месяцев, в файле {len(header)}"
+        )
+    return found
+
+
+def main_column_names(period):
+    names = list(lead_columns)
+    for m in period:
+        names.extend([f"{m}_шт", f"{m}_цена"])
+    return names + tail_columns
+
+
+def month_columns(df, suffix):
+    return [col for col in df.columns if col.endswith(suffix)]
+
+
+NUMBER_PATTERN = r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?"
+
+
+def parse_number_block(frame, remove=("грн.",)):
+    # Разбор цен вида "1 234,50 грн." для целого блока колонок: колонки
+    # склеиваются в одну строковую серию, чистятся одной регуляркой и
+    # разом переводятся в числа, затем возвращаются в форму блока.
+    # Всё, что не похоже на число после чистки, становится NaN.
+    pattern = "|".join(re.escape(token) for token in (*remove, " "))
+    values = pd.concat([frame[col].astype(str) for col in frame.columns], ignore_index=True)
+    values = values.str.replace(pattern, "", regex=True).str.replace(",", ".", regex=False).str.strip()
+
+    valid = values.str.fullmatch(NUMBER_PATTERN).fillna(False).to_numpy(dtype=bool)
+    numbers = np.full(len(values), np.nan)
+    numbers[valid] = values[valid].astype("float64").to_numpy()
+
+    return pd.DataFrame(
+        numbers.reshape(frame.shape, order="F"), index=frame.index, columns=frame.columns
+    )
+
+
+def first_last_prices(prices):
+    # первая/последняя непустая цена по строке через маску notnull:
+    # argmax находит первый True слева и справа без цикла по строкам
+    values = prices.to_numpy(dtype="float64")
+    mask = ~np.isnan(values)
+    has_price = mask.any(axis=1)
+    rows = np.arange(len(values))
+    first_idx = mask.argmax(axis=1)
+    last_idx = values.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    first = np.where(has_price, values[rows, first_idx], np.nan)
+    last = np.where(has_price, values[rows, last_idx], np.nan)
+    return pd.Series(first, index=prices.index), pd.Series(last, index=prices.index)
+
+
+sales_metric_columns = [
+    "Всего месяцев с продажами (recalc)",
+    "Тренд продаж (recalc)",
+    "Волатильность (recalc)",
+    "Месяц макс продаж (recalc)",
+]
+
+
+def sales_metrics(quantities):
+    # показатели динамики продаж по матрице строки x месяцы, без цикла по строкам:
+    # тренд — наклон МНК по номеру месяца (одно матрично-векторное умножение),
+    # волатильность — коэффициент вариации, сезонность — число месяцев с
+    # продажами, месяц максимума — argmax. Пустой месяц считается нулём.
+    values = np.nan_to_num(quantities.to_numpy(dtype="float64"))
+    period = [col.removesuffix("_шт") for col in quantities.columns]
+
+    t = np.arange(values.shape[1], dtype="float64")
+    t -= t.mean()
+    denominator = (t ** 2).sum()
+    slope = values @ t / denominator if denominator else np.zeros(len(values))
+
+    mean = values.mean(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        volatility = np.where(mean > 0, values.std(axis=1) / mean, np.nan)
+
+    has_sales = values > 0
+    peak = np.where(has_sales.any(axis=1), values.argmax(axis=1), -1)
+
+    return pd.DataFrame({
+        "Всего месяцев с продажами (recalc)": has_sales.sum(axis=1),
+        "Тренд продаж (recalc)": slope.round(3),
+        "Волатильность (recalc)": volatility.round(3),
+        "Месяц макс продаж (recalc)": pd.Categorical.from_codes(peak, categories=period),
+    }, index=quantities.index)
+
+
+def compact_main_table(df):
+    # помесячный блок и цены за единицу — float32, количество — int32,
+    # измерения — категории; итоговые суммы остаются float64
+    df[category_columns] = df[category_columns].astype("category")
+    block = month_columns(df, "_шт") + month_columns(df, "_цена") + ["Средняя цена продажи", "закупочная цена"]
+    df[block] = df[block].astype("float32")
+    df["Общее количество продаж (шт)"] = df["Общее количество продаж (шт)"].astype("int32")
+    if "Тренд продаж (recalc)" in df.columns:
+        df[["Тренд продаж (recalc)", "Волатильность (recalc)"]] = df[["Тренд продаж (recalc)", "Волатильность (recalc)"]].astype("float32")
+        df["Всего месяцев с продажами (recalc)"] = df["Всего месяцев с продажами (recalc)"].astype("int16")
+    return df
+
+
+def read_main_csv(path=MAIN_CSV, **kwargs):
+    header = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(path, names=main_column_names(detect_months(header)), skiprows=1, **kwargs)
+
+
+def prepare_frame(df):
+    # разбор цен, пересчёт первой/последней цены и динамики продаж;
+    # работает и на частях файла
+    price_columns = month_columns(df, "_цена")
+    qty_columns = month_columns(df, "_шт")
+    df[qty_columns] = df[qty_columns].apply(pd.to_numeric, errors="coerce")
+    df["Общее количество продаж (шт)"] = df[qty_columns].sum(axis=1)
+
+    parsed_columns = price_columns + ["Итого продаж", "Средняя цена продажи", "закупочная цена", "Закупочная цена всего"]
+    df[parsed_columns] = parse_number_block(df[parsed_columns])
+
+    first, last = first_last_prices(df[price_columns])
+    df["Первая цена за период (recalc)"] = first
+    df["Последняя цена за период (recalc)"] = last
+    df["Изменение цены в гривнах (recalc)"] = df["Последняя цена за период (recalc)"] - df["Первая цена за период (recalc)"]
+    df["Изменение цены % (recalc)"] = (df["Изменение цены в гривнах (recalc)"] / df["Первая цена за период (recalc)"] * 100).round(2)
+
+    df[sales_metric_columns] = sales_metrics(df[qty_columns])
+    return df
+
+
+def prepare_main_table(path=MAIN_CSV):
+    with stage("read_csv") as record:
+        df = read_main_csv(path)
+        record["rows"] = len(df)
+    with stage("parse_prices", rows=len(df)):
+        df = prepare_frame(df)
+    with stage("compact", rows=len(df)):
+        return compact_main_table(df)
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+# ========================
+# замеры этапов
+# ========================
+
+# Каждый этап (чтение CSV, разбор цен, сводные, вкладки) записывает время,
+# число строк, изменение памяти процесса и попадание в кэш. Записи копятся
+# для текущего прогона скрипта (отдельно в каждом потоке-сессии Streamlit),
+# показываются в боковой панели диагностики и пишутся в лог
+# "statistic.profiling" строками JSON. Фрагмент перезапускается без полного
+# прогона — его этапы собираются отдельно (collect) и хранятся в сессии.
+#
+# Замер — это perf_counter и чтение /proc/self/statm, так что его можно
+# держать включённым всегда; STATISTIC_PROFILING=0 отключает полностью.
+
+logger = logging.getLogger("statistic.profiling")
+
+ENABLED = os.environ.get("STATISTIC_PROFILING", "1") != "0"
+
+_local = threading.local()
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # вне Linux — только пиковое значение, но и оно показывает рост
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _state():
+    if not hasattr(_local, "records"):
+        _local.records = []
+        _local.stack = []
+    return _local
+
+
+def begin_run():
+    state = _state()
+    state.records = []
+    state.stack = []
+
+
+def records():
+    return list(_state().records)
+
+
+@contextmanager
+def stage(name, rows=None, cached=False):
+    if not ENABLED:
+        yield {}
+        return
+
+    state = _state()
+    record = {
+        "stage": name,
+        "depth": len(state.stack),
+        "rows": rows,
+        "cache": "hit" if cached else None,
+    }
+    state.records.append(record)
+    state.stack.append(record)
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        record["memory_delta_mb"] = round(_rss_mb() - rss_before, 1)
+        state.stack.pop()
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def cache_miss():
+    # вызывается внутри кэшируемой функции: раз тело выполнилось — это промах
+    for record in reversed(getattr(_local, "stack", [])):
+        if record.get("cache") is not None:
+            record["cache"] = "miss"
+            return
+
+
+@contextmanager
+def collect(name):
+    # этап name и всё вложенное в него — в отдельный список, минуя записи
+    # текущего прогона; список заполнен после выхода из блока
+    state = _state()
+    outer = state.records, state.stack
+    state.records, state.stack = [], []
+    try:
+        with stage(name):
+            yield state.records
+    finally:
+        state.records, state.stack = outer
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from prepare import month_columns
+
+# ========================
+# показатели за произвольный диапазон месяцев
+# ========================
+
+# Строится один раз на версию данных: накопленные суммы количества и
+# выручки по месяцам (для SKU и для групп) и для каждой ячейки — индекс
+# ближайшей непустой цены слева и справа. Тогда итоги за диапазон
+# [start, end] — разность двух столбцов накопленных сумм, а первая и
+# последняя цена — два обращения по индексу, без прохода по месяцам.
+#
+# Итоги групп можно передать готовыми (group_totals — помесячные итоги по
+# измерениям из хранилища): тогда они не пересчитываются по строкам SKU.
+
+range_dimensions = ["subcategory", "Поставщик"]
+
+
+def _prefix(values):
+    # накопленная сумма с нулевым столбцом впереди: сумма [a, b] = p[b + 1] - p[a]
+    prefix = np.zeros((values.shape[0], values.shape[1] + 1), dtype=values.dtype)
+    np.cumsum(values, axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+def _group_sums(keys, values, size):
+    return np.column_stack([np.bincount(keys, weights=values[:, j], minlength=size) for j in range(values.shape[1])])
+
+
+def _month_matrix(totals, dim, field, values, months):
+    table = totals.pivot_table(index=dim, columns="month", values=field, aggfunc="sum")
+    return table.reindex(index=values, columns=months).fillna(0).to_numpy(dtype="float64")
+
+
+def _totals_groups(totals, dim, months):
+    # длинная таблица (значение, месяц, количество, выручка) -> группы × месяцы
+    totals = totals.dropna(subset=[dim])
+    values = pd.Index(sorted(totals[dim].unique()), name=dim)
+    return {
+        "values": values,
+        "quantity": _prefix(_month_matrix(totals, dim, "quantity", values, months)),
+        "revenue": _prefix(_month_matrix(totals, dim, "revenue", values, months)),
+    }
+
+
+def build_range_index(df, group_totals=None):
+    qty_columns = month_columns(df, "_шт")
+    months = [col.removesuffix("_шт") for col in qty_columns]
+
+    qty = np.nan_to_num(df[qty_columns].to_numpy(dtype="float64"))
+    prices = df[month_columns(df, "_цена")].to_numpy(dtype="float32")
+    revenue = qty * np.nan_to_num(prices)
+
+    # индекс ближайшей непустой цены: слева (или -1) и справа (или len(months))
+    has_price = ~np.isnan(prices)
+    positions = np.arange(len(months), dtype="int16")
+    previous = np.maximum.accumulate(np.where(has_price, positions, -1), axis=1).astype("int16")
+    following = np.minimum.accumulate(
+        np.where(has_price, positions, len(months))[:, ::-1], axis=1
+    )[:, ::-1].astype("int16")
+
+    groups = {}
+    for dim in range_dimensions:
+        if dim not in df.columns:
+            continue
+        if group_totals is not None and dim in group_totals:
+            groups[dim] = _totals_groups(group_totals[dim], dim, months)
+            continue
+        codes = df[dim].astype("category")
+        keys = codes.cat.codes.to_numpy()
+        valid = keys >= 0
+        size = len(codes.cat.categories)
+        groups[dim] = {
+            "values": codes.cat.categories,
+            "quantity": _prefix(_group_sums(keys[valid], qty[valid], size)),
+            "revenue": _prefix(_group_sums(keys[valid], revenue[valid], size)),
+        }
+
+    return {
+        "months": months,
+        "quantity": _prefix(qty.astype("float32")),
+        "revenue": _prefix(revenue),
+        "prices": prices,
+        "previous": previous,
+        "following": following,
+        "groups": groups,
+    }
+
+
+def month_bounds(index, start, end):
+    months = index["months"]
+    first, last = months.index(start), months.index(end)
+    if first > last:
+        first, last = last, first
+    return first, last
+
+
+def range_metrics(index, start, end, positions=None):
+    # показатели SKU за диапазон; positions — только нужные строки (из фильтров)
+    first, last = month_bounds(index, start, end)
+    rows = np.arange(len(index["prices"])) if positions is None else np.asarray(positions)
+
+    quantity = index["quantity"][rows, last + 1] - index["quantity"][rows, first]
+    revenue = index["revenue"][rows, last + 1] - index["revenue"][rows, first]
+
+    first_idx = index["following"][rows, first]
+    last_idx = index["previous"][rows, last]
+    has_price = first_idx <= last
+    prices = index["prices"]
+    first_price = np.where(has_price, prices[rows, np.minimum(first_idx, last)], np.nan)
+    last_price = np.where(has_price, prices[rows, np.maximum(last_idx, first)], np.nan)
+    change = last_price - first_price
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change_pct = (change / first_price * 100).round(2)
+
+    return pd.DataFrame({
+        "Продано за период (шт)": quantity,
+        "Выручка за период": revenue.round(2),
+        "Первая цена в диапазоне": first_price,
+        "Последняя цена в диапазоне": last_price,
+        "Изменение цены в диапазоне (грн)": change,
+        "Изменение цены в диапазоне %": change_pct,
+    }, index=rows)
+
+
+def group_range_totals(index, dimension, start, end):
+    # количество и выручка по группам за диапазон — O(число групп)
+    first, last = month_bounds(index, start, end)
+    group = index["groups"][dimension]
+    return pd.DataFrame({
+        dimension: group["values"],
+        "Продано за период (шт)": group["quantity"][:, last + 1] - group["quantity"][:, first],
+        "Выручка за период": (group["revenue"][:, last + 1] - group["revenue"][:, first]).round(2),
+    })
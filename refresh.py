@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from loader import build_version, drop_version, published_key, publish, source_key
+from prepare import month_columns
+from profiling import begin_run, stage
+
+# ========================
+# фоновое обновление данных
+# ========================
+
+# Поток-наблюдатель раз в STATISTIC_REFRESH_SECONDS секунд сравнивает версию
+# источника основной таблицы (хранилище, снапшот или CSV — как в loader) с
+# опубликованной. Новая версия строится в этом потоке: таблица, сводные,
+# индексы фильтров и диапазонов попадают в общий кэш, затем проверяются и
+# публикуются одной подменой ключа. Сессии до подмены работают со старой
+# версией, после — все сразу с новой; загрузка не попадает в запрос.
+# В потоковом режиме так же строятся и публикуются потоковые сводные.
+# Первая версия после запуска строится в потоке сразу, без ожидания опроса.
+#
+# Файл, который ещё дописывается, меняет размер и mtime между опросами —
+# версия строится, только когда два опроса подряд видят один и тот же ключ.
+# Версия, не прошедшая проверку, не публикуется и повторно не строится.
+# Старая версия выбрасывается из кэша на следующем опросе, чтобы прогоны,
+# начатые до подмены, успели её дочитать. STATISTIC_REFRESH_SECONDS=0
+# отключает наблюдатель.
+
+REFRESH_SECONDS = float(os.environ.get("STATISTIC_REFRESH_SECONDS", 30))
+
+THREAD_NAME = "statistic-refresh"
+
+required_columns = ["Артикул", "subcategory", "Итого продаж", "Первая цена за период (recalc)"]
+
+logger = logging.getLogger("statistic.refresh")
+
+_lock = threading.Lock()
+_state = {"seen": None, "retired": None, "failed": set()}
+
+
+def validate_version(df, summaries):
+    if df is None:
+        # потоковый режим: построчной таблицы нет, проверяются только сводные
+        if not summaries or any(summary.empty for summary in summaries.values()):
+            raise ValueError("Потоковые сводные пустые")
+        return
+
+    missing = [col for col in required_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Нет колонок: {', '.join(missing)}")
+    if df.empty:
+        raise ValueError("Таблица пустая")
+    if not month_columns(df, "_шт"):
+        raise ValueError("Нет помесячных колонок")
+
+    # сводные должны сходиться с построчной таблицей
+    for by, summary in summaries.items():
+        expected = df.loc[df[by].notna(), "Итого продаж"].sum()
+        if not np.isclose(summary["Сумма продаж"].sum(), expected, rtol=1e-6, atol=0.01 * len(summary)):
+            raise ValueError(f"Сводная по {by} не сходится с таблицей")
+
+
+def refresh_once(initial=False):
+    # один опрос; True — опубликована новая версия. initial — первая версия
+    # после запуска: строится без ожидания второго опроса
+    begin_run()
+    if _state["retired"] is not None:
+        drop_version(_state["retired"])
+        _state["retired"] = None
+
+    key = source_key()
+    seen, _state["seen"] = _state["seen"], key
+    current = published_key(key[0])
+    if key == current or (key != seen and not initial) or key in _state["failed"]:
+        return False
+
+    try:
+        with stage("refresh") as record:
+            df, summaries = build_version(key)
+            record["rows"] = None if df is None else len(df)
+            validate_version(df, summaries)
+    except Exception:
+        logger.exception("Версия %s не прошла проверку — остаётся %s", key, current)
+        _state["failed"].add(key)
+        drop_version(key)
+        return False
+
+    publish(key)
+    _state["retired"] = current
+    logger.info("Опубликована версия %s", key)
+    return True
+
+
+def _poll(initial=False):
+    try:
+        refresh_once(initial)
+    except OSError:
+        # источник заменяют прямо сейчас — попробуем на следующем опросе
+        logger.warning("Источник недоступен, опрос пропущен", exc_info=True)
+
+
+def _watch(interval):
+    _poll(initial=True)
+    while True:
+        time.sleep(interval)
+        _poll()
+
+
+def start_watcher(interval=REFRESH_SECONDS):
+    # один поток на процесс; он же строит первую версию и публикует её,
+    # когда всё готово — до этого сессии читают источник сами, как без наблюдателя
+    if interval <= 0:
+        return None
+    with _lock:
+        for thread in threading.enumerate():
+            if thread.name == THREAD_NAME:
+                return thread
+        thread = threading.Thread(target=_watch, args=(interval,), name=THREAD_NAME, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,135 @@
+import argparse
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from aggregates import growth_candidates, summarize
+from loader import read_main_table
+
+# ========================
+# пакетные отчёты без интерфейса
+# ========================
+
+# Те же расчёты, что во вкладках, но из командной строки: сводные по
+# измерениям, кандидаты на повышение цен и отдельный отчёт на каждого
+# поставщика / подкатегорию. Отчёты по группам строятся параллельно в пуле
+# процессов.
+#
+#     python reports.py --out reports --format html --workers 8
+
+formats = ["csv", "parquet", "html"]
+
+report_dimensions = {
+    "Поставщик": "vendors",
+    "subcategory": "subcategories",
+}
+
+sku_columns = [
+    "Артикул",
+    "Поставщик",
+    "title",
+    "category",
+    "subcategory",
+    "Средняя цена продажи",
+    "Общее количество продаж (шт)",
+    "Итого продаж",
+    "Первая цена за период (recalc)",
+    "Последняя цена за период (recalc)",
+    "Изменение цены в гривнах (recalc)",
+    "Изменение цены % (recalc)",
+]
+
+
+def safe_filename(name):
+    return re.sub(r"[^\w\-. ]+", "_", str(name)).strip() or "_"
+
+
+def unique_filenames(values):
+    # "A/B" и "A_B" дают одно безопасное имя — к повторам дописывается номер;
+    # регистр не различается, как в файловых системах Windows и macOS
+    names, taken = [], set()
+    for value in values:
+        base = name = safe_filename(value)
+        number = 1
+        while name.lower() in taken:
+            number += 1
+            name = f"{base}_{number}"
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+
+def write_table(frame, path, fmt, title=None):
+    if fmt == "csv":
+        frame.to_csv(path, index=False)
+    elif fmt == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        heading = f"<h1>{html.escape(title)}</h1>\n" if title else ""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'<html><head><meta charset="utf-8"></head><body>\n{heading}{frame.to_html(index=False)}\n</body></html>\n')
+
+
+def write_group_report(dimension, value, metrics, rows, out_dir, filename, fmt):
+    # отчёт по одной группе: её показатели из сводной и все её товары
+    path = os.path.join(out_dir, f"{filename}.{fmt}")
+    rows = rows.sort_values("Итого продаж", ascending=False)
+
+    if fmt == "html":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<html><head><meta charset="utf-8"></head><body>\n')
+            f.write(f"<h1>{html.escape(f'{dimension}: {value}')}</h1>\n")
+            f.write(metrics.T.to_html(header=False))
+            f.write("\n<h2>Товары</h2>\n")
+            f.write(rows.to_html(index=False))
+            f.write("\n</body></html>\n")
+    else:
+        # в табличных форматах показатели группы дописываются к каждой строке
+        report = rows.assign(**{col: metrics.iloc[0][col] for col in metrics.columns if col not in rows.columns})
+        write_table(report, path, fmt)
+    return path
+
+
+def build_reports(out_dir, fmt="csv", workers=None, dimensions=tuple(report_dimensions), min_items=5):
+    df = read_main_table()
+    os.makedirs(out_dir, exist_ok=True)
+    columns = [col for col in sku_columns if col in df.columns]
+    written = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for dimension in dimensions:
+            summary = summarize(df, dimension)
+            name = report_dimensions.get(dimension, safe_filename(dimension))
+            for table, suffix in ((summary, "summary"), (growth_candidates(summary, min_items), "candidates")):
+                path = os.path.join(out_dir, f"{name}_{suffix}.{fmt}")
+                write_table(table, path, fmt, title=f"{dimension}: {suffix}")
+                written.append(path)
+
+            group_dir = os.path.join(out_dir, name)
+            os.makedirs(group_dir, exist_ok=True)
+            metrics = summary.set_index(dimension)
+            groups = list(df.groupby(dimension, observed=True, sort=True)[columns])
+            filenames = unique_filenames(value for value, _ in groups)
+            for (value, rows), filename in zip(groups, filenames):
+                futures.append(pool.submit(
+                    write_group_report, dimension, value, metrics.loc[[value]], rows, group_dir, filename, fmt
+                ))
+
+        written += [future.result() for future in futures]
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетные отчёты по поставщикам и подкатегориям")
+    parser.add_argument("--out", default="reports", help="папка для отчётов")
+    parser.add_argument("--format", choices=formats, default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--dimension", action="append", choices=list(report_dimensions),
+                        help="измерение для отчётов; можно указать несколько раз")
+    parser.add_argument("--min-items", type=int, default=5, help="порог товаров для кандидатов на повышение")
+    args = parser.parse_args()
+
+    paths = build_reports(args.out, args.format, args.workers, args.dimension or tuple(report_dimensions), args.min_items)
+    print(f"Записано отчётов: {len(paths)} в {args.out}")
@@ -0,0 +1,123 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ========================
+# поиск товаров по названию и артикулу
+# ========================
+
+# Строится один раз на версию данных: названия и артикулы разбиваются на
+# слова, словарь слов сортируется, для каждого слова хранятся позиции
+# строк (CSR: общий массив позиций и смещения по словам). Слова с общим
+# префиксом лежат в словаре подряд, поэтому поиск по префиксу — два
+# searchsorted и срез массива позиций, без прохода по строкам таблицы.
+#
+# Все слова запроса должны найтись (как префиксы). Выше в выдаче строки,
+# где слово совпало целиком, и точное совпадение артикула.
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# совпадение слова целиком весит больше префикса; артикул целиком — больше всего
+PREFIX_SCORE = 1
+EXACT_SCORE = 2
+SKU_SCORE = 10
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def build_search_index(df):
+    skus = df["Артикул"].astype(str).str.lower().reset_index(drop=True)
+    text = skus
+    if "title" in df.columns:
+        text = df["title"].astype(str).str.lower().reset_index(drop=True) + " " + skus
+
+    words = text.str.findall(TOKEN_PATTERN.pattern).explode().dropna()
+    pairs = pd.DataFrame({"row": words.index.to_numpy(dtype="int64"), "token": words.to_numpy()}).drop_duplicates()
+    codes, vocabulary = pd.factorize(pairs["token"], sort=True)
+
+    order = np.argsort(codes, kind="stable")
+    offsets = np.zeros(len(vocabulary) + 1, dtype="int64")
+    np.cumsum(np.bincount(codes, minlength=len(vocabulary)), out=offsets[1:])
+
+    # прямой индекс: коды слов по строкам (пары уже идут в порядке строк)
+    row_offsets = np.zeros(len(df) + 1, dtype="int64")
+    np.cumsum(np.bincount(pairs["row"].to_numpy(), minlength=len(df)), out=row_offsets[1:])
+
+    sku_order = np.argsort(skus.to_numpy(dtype=object), kind="stable")
+    return {
+        "size": len(df),
+        "vocabulary": np.asarray(vocabulary, dtype=object),
+        "offsets": offsets,
+        "rows": pairs["row"].to_numpy()[order].astype("int32"),
+        "row_offsets": row_offsets,
+        "row_tokens": codes.astype("int32"),
+        "skus": skus.to_numpy(dtype=object)[sku_order],
+        "sku_rows": sku_order.astype("int32"),
+    }
+
+
+def _token_range(index, term):
+    vocabulary = index["vocabulary"]
+    low = np.searchsorted(vocabulary, term, side="left")
+    high = np.searchsorted(vocabulary, term + "\U0010ffff", side="left")
+    exact = low < high and vocabulary[low] == term
+    return low, high, exact
+
+
+def _row_tokens(index, candidates):
+    # коды слов для каждой строки-кандидата одним срезом по прямому индексу
+    starts = index["row_offsets"][candidates]
+    lengths = index["row_offsets"][candidates + 1] - starts
+    owner = np.repeat(np.arange(len(candidates)), lengths)
+    within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, index["row_tokens"][np.repeat(starts, lengths) + within]
+
+
+def search_positions(index, query, positions=None):
+    # позиции строк, где нашлись все слова запроса, по убыванию релевантности;
+    # positions — ограничение из фильтров (None — все строки)
+    terms = tokenize(query)
+    if not terms:
+        return np.arange(index["size"]) if positions is None else np.asarray(positions)
+
+    offsets, rows = index["offsets"], index["rows"]
+    ranges = sorted((_token_range(index, term) for term in terms), key=lambda r: offsets[r[1]] - offsets[r[0]])
+
+    # самое редкое слово — по обратному индексу, остальные проверяются
+    # только у найденных строк по прямому индексу
+    low, high, exact = ranges[0]
+    first = np.zeros(index["size"], dtype="int8")
+    first[rows[offsets[low]:offsets[high]]] = PREFIX_SCORE
+    if exact:
+        first[rows[offsets[low]:offsets[low + 1]]] = EXACT_SCORE
+    if positions is not None:
+        allowed = np.zeros(index["size"], dtype=bool)
+        allowed[np.asarray(positions, dtype=np.intp)] = True
+        first[~allowed] = 0
+
+    candidates = np.flatnonzero(first)
+    score = first[candidates].astype("int32")
+    for low, high, exact in ranges[1:]:
+        if not len(candidates):
+            break
+        owner, codes = _row_tokens(index, candidates)
+        found = np.bincount(owner, weights=(codes >= low) & (codes < high), minlength=len(candidates)) > 0
+        whole = np.bincount(owner, weights=codes == low, minlength=len(candidates)) > 0 if exact else False
+        score = score + np.where(whole, EXACT_SCORE, PREFIX_SCORE)
+        candidates, score = candidates[found], score[found]
+
+    # артикул, совпавший с запросом целиком, — первым, даже если слова не нашлись
+    skus = index["skus"]
+    sku = query.strip().lower()
+    sku_rows = index["sku_rows"][np.searchsorted(skus, sku, side="left"):np.searchsorted(skus, sku, side="right")]
+    if positions is not None and len(sku_rows):
+        sku_rows = sku_rows[np.isin(sku_rows, np.asarray(positions))]
+    if len(sku_rows):
+        keep = ~np.isin(candidates, sku_rows)
+        candidates = np.concatenate([sku_rows, candidates[keep]])
+        score = np.concatenate([np.full(len(sku_rows), SKU_SCORE + score.max(initial=0)), score[keep]])
+
+    return candidates[np.argsort(-score, kind="stable")]
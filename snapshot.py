@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+
+from prepare import MAIN_CSV, prepare_main_table
+
+# ========================
+# колоночные снапшоты (Parquet)
+# ========================
+
+# Выгрузки один раз разбираются и типизируются, затем сохраняются в Parquet.
+# Приложение читает снапшот с memory-mapping, не разбирая CSV заново.
+#
+#     python snapshot.py
+
+SNAPSHOT_DIR = "snapshots"
+
+sources = {
+    "main": (MAIN_CSV, prepare_main_table),
+}
+
+
+def snapshot_path(name, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"{name}.parquet")
+
+
+def build_snapshot(name, snapshot_dir=SNAPSHOT_DIR):
+    csv_path, prepare = sources[name]
+    df = prepare(csv_path)
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = snapshot_path(name, snapshot_dir)
+    # пишем во временный файл и подменяем, чтобы читатели не увидели половину файла
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    return [build_snapshot(name, snapshot_dir) for name, (csv_path, _) in sources.items() if os.path.exists(csv_path)]
+
+
+def read_snapshot(path):
+    return pd.read_parquet(path, memory_map=True)
+
+
+if __name__ == "__main__":
+    for path in build_snapshots():
+        print(path)
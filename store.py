@@ -0,0 +1,244 @@
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from facts import build_fact_tables
+from prepare import (
+    MAIN_CSV, compact_main_table, month_columns, parse_number_block, prepare_main_table, sales_metric_columns, sales_metrics,
+)
+
+# ========================
+# локальное хранилище с помесячной дозагрузкой
+# ========================
+
+# SQLite-база хранит помесячные факты, состояние каждого SKU (первая и
+# последняя цена, итоги, число месяцев с продажами) и итоги по измерениям.
+# Новый месяц дописывается отдельно: обновляются только строки из его
+# выгрузки, поэтому время обновления зависит от размера месяца, а не всей
+# истории.
+#
+#     python store.py init
+#     python store.py append 05.2025 "Summar - 05.2025.csv"
+#
+# Файл месяца — CSV с колонками "Артикул", "шт", "цена".
+
+STORE_PATH = "store.sqlite"
+
+schema = """
+CREATE TABLE IF NOT EXISTS months (
+    month TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skus (
+    "Артикул" TEXT PRIMARY KEY,
+    "Поставщик" TEXT,
+    title TEXT,
+    category TEXT,
+    subcategory TEXT,
+    "закупочная цена" REAL,
+    "Средняя цена продажи" REAL,
+    first_price REAL,
+    last_price REAL,
+    total_qty REAL NOT NULL DEFAULT 0,
+    months_with_sales INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0,
+    purchase_total REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS monthly (
+    "Артикул" TEXT NOT NULL,
+    month TEXT NOT NULL,
+    quantity REAL,
+    price REAL,
+    PRIMARY KEY ("Артикул", month)
+);
+CREATE TABLE IF NOT EXISTS dimension_totals (
+    dimension TEXT NOT NULL,
+    value TEXT,
+    month TEXT NOT NULL,
+    quantity REAL,
+    revenue REAL
+);
+CREATE INDEX IF NOT EXISTS dimension_totals_month ON dimension_totals (dimension, month);
+"""
+
+dimensions = ["Поставщик", "subcategory", "category"]
+
+
+def month_position(month):
+    # "04.2025" -> 2025 * 12 + 4, чтобы месяцы сортировались по времени
+    mm, yyyy = month.split(".")
+    return int(yyyy) * 12 + int(mm)
+
+
+def connect(path=STORE_PATH):
+    connection = sqlite3.connect(path)
+    connection.executescript(schema)
+    return connection
+
+
+def _update_dimension_totals(connection, month):
+    connection.execute("DELETE FROM dimension_totals WHERE month = ?", (month,))
+    for dim in dimensions:
+        connection.execute(
+            f"""
+            INSERT INTO dimension_totals (dimension, value, month, quantity, revenue)
+            SELECT ?, s."{dim}", m.month, SUM(m.quantity), SUM(m.quantity * m.price)
+            FROM monthly m JOIN skus s ON s."Артикул" = m."Артикул"
+            WHERE m.month = ?
+            GROUP BY s."{dim}"
+            """,
+            (dim, month),
+        )
+
+
+def init_store(path=STORE_PATH, source=MAIN_CSV):
+    # начальное заполнение из полной выгрузки; существующая база пересоздаётся
+    df = prepare_main_table(source)
+    tables = build_fact_tables(df)
+    facts = tables["facts"]
+    months = tables["months"]["month"].tolist()
+
+    qty = df[[f"{m}_шт" for m in months]].to_numpy(dtype="float64")
+    skus = pd.DataFrame({
+        "Артикул": df["Артикул"].astype(str).to_numpy(),
+        "Поставщик": df["Поставщик"].astype(object).to_numpy(),
+        "title": df["title"].to_numpy(),
+        "category": df["category"].astype(object).to_numpy(),
+        "subcategory": df["subcategory"].astype(object).to_numpy(),
+        "закупочная цена": df["закупочная цена"].to_numpy(dtype="float64"),
+        "Средняя цена продажи": df["Средняя цена продажи"].to_numpy(dtype="float64"),
+        "first_price": df["Первая цена за период (recalc)"].to_numpy(),
+        "last_price": df["Последняя цена за период (recalc)"].to_numpy(),
+        "total_qty": np.nansum(qty, axis=1),
+        "months_with_sales": (np.nan_to_num(qty) > 0).sum(axis=1),
+        "revenue": df["Итого продаж"].fillna(0).to_numpy(),
+        "purchase_total": df["Закупочная цена всего"].fillna(0).to_numpy(),
+    }).drop_duplicates("Артикул")
+
+    monthly = pd.DataFrame({
+        "Артикул": skus["Артикул"].reindex(facts["sku_id"]).to_numpy(),
+        "month": np.asarray(months, dtype=object)[facts["month_id"].to_numpy()],
+        "quantity": facts["quantity"].to_numpy(dtype="float64"),
+        "price": facts["price"].to_numpy(dtype="float64"),
+    }).dropna(subset=["Артикул"])
+
+    if os.path.exists(path):
+        os.remove(path)
+    with connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO months (month, position) VALUES (?, ?)",
+            [(m, month_position(m)) for m in months],
+        )
+        skus.to_sql("skus", connection, if_exists="append", index=False)
+        monthly.to_sql("monthly", connection, if_exists="append", index=False)
+        for m in months:
+            _update_dimension_totals(connection, m)
+    return path
+
+
+def read_month_file(path):
+    delta = pd.read_csv(path, usecols=["Артикул", "шт", "цена"])
+    delta["Артикул"] = delta["Артикул"].astype(str)
+    delta[["шт", "цена"]] = parse_number_block(delta[["шт", "цена"]])
+    return delta.dropna(subset=["шт", "цена"], how="all").drop_duplicates("Артикул", keep="last")
+
+
+def append_month(month, month_file, path=STORE_PATH):
+    delta = read_month_file(month_file)
+    position = month_position(month)
+
+    with connect(path) as connection:
+        latest = connection.execute("SELECT MAX(position) FROM months").fetchone()[0]
+        if latest is not None and position <= latest:
+            raise ValueError(f"Месяц {month} не новее уже загруженных — дописывать можно только следующий месяц")
+
+        connection.execute("INSERT INTO months (month, position) VALUES (?, ?)", (month, position))
+        rows = list(zip(delta["Артикул"], [month] * len(delta), delta["шт"].astype(object), delta["цена"].astype(object)))
+        rows = [(sku, m, None if pd.isna(q) else q, None if pd.isna(p) else p) for sku, m, q, p in rows]
+        connection.executemany(
+            'INSERT INTO monthly ("Артикул", month, quantity, price) VALUES (?, ?, ?, ?)', rows
+        )
+
+        # новые артикулы появляются без атрибутов — их дополнит следующая полная выгрузка
+        connection.executemany(
+            'INSERT OR IGNORE INTO skus ("Артикул") VALUES (?)', [(sku,) for sku, *_ in rows]
+        )
+        # месяц новее всех загруженных: первая цена ставится только если её ещё не было,
+        # последняя — берётся из этого месяца, если в нём есть цена
+        connection.executemany(
+            """
+            UPDATE skus SET
+                first_price = COALESCE(first_price, :price),
+                last_price = COALESCE(:price, last_price),
+                total_qty = total_qty + COALESCE(:qty, 0),
+                months_with_sales = months_with_sales + (COALESCE(:qty, 0) > 0),
+                revenue = revenue + COALESCE(:qty, 0) * COALESCE(:price, 0),
+                purchase_total = purchase_total + COALESCE(:qty, 0) * COALESCE("закупочная цена", 0)
+            WHERE "Артикул" = :sku
+            """,
+            [{"sku": sku, "qty": q, "price": p} for sku, _, q, p in rows],
+        )
+        connection.execute(
+            'UPDATE skus SET "Средняя цена продажи" = revenue / total_qty WHERE total_qty > 0 AND "Артикул" IN '
+            '(SELECT "Артикул" FROM monthly WHERE month = ?)',
+            (month,),
+        )
+        _update_dimension_totals(connection, month)
+    return len(rows)
+
+
+def read_store_table(path=STORE_PATH):
+    # основная таблица в том же виде, что и prepare_main_table
+    with connect(path) as connection:
+        months = pd.read_sql("SELECT month FROM months ORDER BY position", connection)["month"].tolist()
+        skus = pd.read_sql("SELECT * FROM skus", connection)
+        monthly = pd.read_sql('SELECT "Артикул", month, quantity, price FROM monthly', connection)
+
+    wide = monthly.pivot(index="Артикул", columns="month", values=["quantity", "price"])
+    df = skus.rename(columns={"revenue": "Итого продаж", "purchase_total": "Закупочная цена всего"})
+    for m in months:
+        for field, suffix in (("quantity", "_шт"), ("price", "_цена")):
+            column = wide[(field, m)] if (field, m) in wide.columns else pd.Series(dtype="float64")
+            df[f"{m}{suffix}"] = column.reindex(df["Артикул"]).to_numpy()
+
+    df["Общее количество продаж (шт)"] = df.pop("total_qty")
+    df["Всего месяцев с продажами (сезонность)"] = df.pop("months_with_sales")
+    # в хранилище одна первая/последняя цена — её же показывают исходные колонки выгрузки
+    df["Первая цена за период"] = df["Первая цена за период (recalc)"] = df.pop("first_price")
+    df["Последняя цена за период"] = df["Последняя цена за период (recalc)"] = df.pop("last_price")
+    df["Изменение цены в гривнах"] = df["Последняя цена за период"] - df["Первая цена за период"]
+    df["Изменение цены в гривнах (recalc)"] = df["Изменение цены в гривнах"]
+    df["Изменение цены % (recalc)"] = (df["Изменение цены в гривнах (recalc)"] / df["Первая цена за период (recalc)"] * 100).round(2)
+    df[sales_metric_columns] = sales_metrics(df[month_columns(df, "_шт")])
+    return compact_main_table(df)
+
+
+def read_dimension_totals(dimension, path=STORE_PATH):
+    if dimension not in dimensions:
+        raise ValueError(f"Неизвестное измерение: {dimension}")
+    with connect(path) as connection:
+        return pd.read_sql(
+            f'SELECT t.value AS "{dimension}", t.month, t.quantity, t.revenue FROM dimension_totals t '
+            "JOIN months m ON m.month = t.month WHERE t.dimension = ? ORDER BY m.position, t.value",
+            connection,
+            params=(dimension,),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальное хранилище продаж")
+    commands = parser.add_subparsers(dest="command", required=True)
+    init = commands.add_parser("init", help="заполнить хранилище из полной выгрузки")
+    init.add_argument("source", nargs="?", default=MAIN_CSV)
+    append = commands.add_parser("append", help="дописать новый месяц")
+    append.add_argument("month", help="месяц в формате MM.YYYY")
+    append.add_argument("file", help='CSV с колонками "Артикул", "шт", "цена"')
+    args = parser.parse_args()
+
+    if args.command == "init":
+        print(init_store(source=args.source))
+    else:
+        print(append_month(args.month, args.file))
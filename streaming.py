@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import derive_metrics, summary_aggregations
+from prepare import MAIN_CSV, month_columns, prepare_frame, read_main_csv
+
+# ========================
+# потоковая загрузка по частям
+# ========================
+
+# Для выгрузок, которые не помещаются в память: CSV читается кусками, цены
+# разбираются в каждом куске, а в памяти живут только накопленные агрегаты —
+# частичные суммы по измерениям, 64-битные ключи уникальных пар
+# (группа, артикул) для счёта уникальных артикулов и суммы по месяцам.
+# Пиковая память — размер куска плюс эти агрегаты.
+
+CHUNK_ROWS = 100_000
+
+# частичные агрегаты, которые корректно складываются между кусками
+partial_aggregations = {
+    "Кол-во продаж": ("Общее количество продаж (шт)", "sum"),
+    "Товаров": ("Артикул", "count"),
+    "Сумма продаж": ("Итого продаж", "sum"),
+    "Всего потрачено на закупку": ("Закупочная цена всего", "sum"),
+    "price_sum": ("Средняя цена продажи", "sum"),
+    "price_count": ("Средняя цена продажи", "count"),
+    "cost_sum": ("закупочная цена", "sum"),
+    "cost_count": ("закупочная цена", "count"),
+    "change_pct_sum": ("Изменение цены % (recalc)", "sum"),
+    "change_pct_count": ("Изменение цены % (recalc)", "count"),
+    "Макс_рост_цены_грн": ("Изменение цены в гривнах (recalc)", "max"),
+    "Мин_падение_цены_грн": ("Изменение цены в гривнах (recalc)", "min"),
+}
+
+combine_functions = {
+    name: {"max": "max", "min": "min"}.get(func, "sum") for name, (_, func) in partial_aggregations.items()
+}
+
+
+def stream_main_table(path=MAIN_CSV, chunksize=CHUNK_ROWS):
+    for chunk in read_main_csv(path, chunksize=chunksize):
+        yield prepare_frame(chunk)
+
+
+def _combine(state, partial, by):
+    if state is None:
+        return partial
+    return pd.concat([state, partial]).groupby(level=by, sort=False).agg(combine_functions)
+
+
+def _pair_parts(parts, keys, codes):
+    # уникальные пары (группа, артикул) хранятся отсортированными частями;
+    # новая часть сливается с последней, пока та не больше её вдвое
+    # (как двоичный счётчик), так что каждая пара переобрабатывается
+    # O(log числа кусков) раз, а не на каждом куске
+    keys, first = np.unique(keys, return_index=True)
+    parts.append((keys, codes[first]))
+    while len(parts) > 1 and len(parts[-2][0]) <= 2 * len(parts[-1][0]):
+        (keys_a, codes_a), (keys_b, codes_b) = parts.pop(-2), parts.pop()
+        keys, first = np.unique(np.concatenate([keys_a, keys_b]), return_index=True)
+        parts.append((keys, np.concatenate([codes_a, codes_b])[first]))
+    return parts
+
+
+def _pair_keys(rows, dim, labels):
+    # код группы (словарь labels растёт по мере появления значений) и 64-битный
+    # ключ пары: хэш артикула, смешанный с кодом группы
+    values = rows[dim]
+    for value in values.unique():
+        labels.setdefault(value, len(labels))
+    codes = values.map(labels).to_numpy(dtype="uint64")
+    sku_hash = pd.util.hash_array(rows["Артикул"].astype(str).to_numpy(dtype=object))
+    return sku_hash ^ (codes * np.uint64(0x9E3779B97F4A7C15)), codes
+
+
+def _unique_counts(parts, labels):
+    if not parts:
+        return pd.Series(dtype="int64")
+    keys = np.concatenate([keys for keys, _ in parts])
+    codes = np.concatenate([codes for _, codes in parts])
+    _, first = np.unique(keys, return_index=True)
+    counts = np.bincount(codes[first].astype("int64"), minlength=len(labels))
+    return pd.Series(counts, index=list(labels))
+
+
+def _finalize_summary(partials, unique_counts, by):
+    summary = partials.copy()
+    summary["Уникальные артикулы"] = unique_counts.reindex(summary.index).fillna(0)
+    summary["Средняя цена за единицу"] = summary["price_sum"] / summary["price_count"]
+    summary["Средняя закупочная цена"] = summary["cost_sum"] / summary["cost_count"]
+    summary["Среднее_изменение_цены_проц"] = summary["change_pct_sum"] / summary["change_pct_count"]
+    summary = summary.drop(columns=[
+        "price_sum", "price_count", "cost_sum", "cost_count", "change_pct_sum", "change_pct_count",
+    ])
+    return derive_metrics(summary[list(summary_aggregations)].sort_index())
+
+
+def stream_aggregates(path=MAIN_CSV, dimensions=("subcategory", "Поставщик", "category"), chunksize=CHUNK_ROWS):
+    partials = dict.fromkeys(dimensions)
+    pair_parts = {dim: [] for dim in dimensions}
+    labels = {dim: {} for dim in dimensions}
+    months = None
+    monthly_quantity = monthly_revenue = None
+
+    for chunk in stream_main_table(path, chunksize):
+        for dim in dimensions:
+            rows = chunk.dropna(subset=[dim])
+            partial = rows.groupby(dim, sort=False).agg(**partial_aggregations)
+            partials[dim] = _combine(partials[dim], partial, dim)
+            rows = rows.dropna(subset=["Артикул"])
+            if len(rows):
+                pair_parts[dim] = _pair_parts(pair_parts[dim], *_pair_keys(rows, dim, labels[dim]))
+
+        qty_columns = month_columns(chunk, "_шт")
+        qty = chunk[qty_columns].to_numpy(dtype="float64")
+        prices = chunk[month_columns(chunk, "_цена")].to_numpy(dtype="float64")
+        if months is None:
+            months = [col.removesuffix("_шт") for col in qty_columns]
+            monthly_quantity = np.zeros(len(months))
+            monthly_revenue = np.zeros(len(months))
+        monthly_quantity += np.nansum(qty, axis=0)
+        monthly_revenue += np.nansum(qty * prices, axis=0)
+
+    return {
+        "summaries": {
+            dim: _finalize_summary(partials[dim], _unique_counts(pair_parts[dim], labels[dim]), dim)
+            for dim in dimensions if partials[dim] is not None
+        },
+        "monthly": pd.DataFrame({
+            "month": months or [],
+            "quantity": monthly_quantity if months else [],
+            "revenue": monthly_revenue if months else [],
+        }),
+    }
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ========================
+# постраничный вывод таблиц
+# ========================
+
+# Поиск, сортировка и нарезка страниц выполняются на сервере, в браузер
+# уходит только текущая страница и только нужные колонки — размер ответа
+# не зависит от того, сколько строк попало под фильтр.
+
+page_sizes = [25, 50, 100, 250]
+
+
+def _search_mask(frame, positions, columns, query):
+    mask = np.zeros(len(positions), dtype=bool)
+    for col in columns:
+        series = frame[col]
+        if pd.api.types.is_numeric_dtype(series):
+            continue
+        values = pd.Series(series.to_numpy()[positions]).astype(str)
+        mask |= values.str.contains(query, case=False, regex=False).to_numpy(dtype=bool)
+    return mask
+
+
+def _sorted_positions(frame, positions, column, ascending):
+    values = pd.Series(frame[column].to_numpy()[positions])
+    order = values.sort_values(ascending=ascending, na_position="last", kind="stable").index
+    return positions[order.to_numpy()]
+
+
+def _reset_page(page_key):
+    st.session_state[page_key] = 1
+
+
+def paginated_dataframe(frame, key, columns=None, positions=None, default_page_size=50, searchable=True):
+    # searchable=False — без своего поиска (str.contains по строкам), когда
+    # позиции уже отобраны поиском по индексу
+    columns = list(frame.columns) if columns is None else list(columns)
+    positions = np.arange(len(frame)) if positions is None else np.asarray(positions, dtype=np.intp)
+
+    # любая смена поиска, сортировки или размера страницы возвращает на первую страницу
+    page_key = f"{key}_page"
+    reset = {"on_change": _reset_page, "args": (page_key,)}
+
+    if searchable:
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        query = search_col.text_input("Поиск", key=f"{key}_search", **reset)
+    else:
+        sort_col, order_col, size_col = st.columns([2, 1, 1])
+        query = ""
+    sort_by = sort_col.selectbox("Сортировка", ["—"] + columns, key=f"{key}_sort", **reset)
+    ascending = order_col.radio("Порядок", ["↑", "↓"], horizontal=True, key=f"{key}_order", **reset) == "↑"
+    page_size = size_col.selectbox(
+        "Строк на странице", page_sizes, index=page_sizes.index(default_page_size), key=f"{key}_size", **reset
+    )
+
+    if query:
+        positions = positions[_search_mask(frame, positions, columns, query)]
+    if sort_by != "—":
+        positions = _sorted_positions(frame, positions, sort_by, ascending)
+
+    total = len(positions)
+    pages = max(1, -(-total // page_size))
+    # после смены внешних фильтров номер страницы мог выйти за пределы
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Страница", min_value=1, max_value=pages, key=page_key)
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+
+    st.dataframe(frame.iloc[positions[start:end], frame.columns.get_indexer(columns)])
+    st.caption(f"Строки {start + 1 if total else 0}–{end} из {total}")
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import format_price
+from prepare import first_last_prices, parse_number_block
+
+# Построчные функции из исходного app.py — эталон для векторных
+# parse_number_block и first_last_prices.
+
+
+def parse_price(value):
+    try:
+        return float(str(value).replace("грн.", "").replace(",", ".").replace("\u00a0", "").strip())
+    except:
+        return None
+
+
+def get_first_price(row, price_columns):
+    for col in price_columns:
+        if pd.notnull(row[col]):
+            return row[col]
+    return None
+
+
+def get_last_price(row, price_columns):
+    for col in reversed(price_columns):
+        if pd.notnull(row[col]):
+            return row[col]
+    return None
+
+
+# разделитель тысяч в выгрузке — неразрывный пробел (\u00a0); обычный
+# пробел эталон не убирает, такая ячейка — мусор
+raw_prices = pd.DataFrame({
+    "06.2024_цена": ["1\u00a0234,50 грн.", "715,10 грн.", None, "abc", np.nan, "12 345,00 грн."],
+    "07.2024_цена": ["", "грн.", None, "3\u00a0529,69 грн.", np.nan, "-3,50 грн."],
+    "08.2024_цена": ["10\u00a0290,47 грн.", "—", None, "1\u00a0000\u00a0000,13 грн.", np.nan, "0,5"],
+    "09.2024_цена": [np.nan, "42", None, " 7,25 грн. ", np.nan, "1,2,3"],
+})
+
+
+def reference_block(frame):
+    return frame.apply(lambda col: col.map(parse_price)).astype("float64")
+
+
+def test_parse_number_block_matches_parse_price():
+    pd.testing.assert_frame_equal(parse_number_block(raw_prices), reference_block(raw_prices))
+
+
+def test_first_last_prices_match_row_functions():
+    prices = reference_block(raw_prices)
+    columns = list(prices.columns)
+    first, last = first_last_prices(prices)
+
+    expected_first = prices.apply(get_first_price, axis=1, args=(columns,)).astype("float64")
+    expected_last = prices.apply(get_last_price, axis=1, args=(columns,)).astype("float64")
+    pd.testing.assert_series_equal(first, expected_first)
+    pd.testing.assert_series_equal(last, expected_last)
+    # строка без единой цены — обе цены NaN
+    assert np.isnan(first.iloc[2]) and np.isnan(last.iloc[4])
+
+
+def test_generated_prices_parse_back():
+    values = np.array([1_000_000.13, -3.5, 0.05, -0.05, 999.99, 1000, -1_234_567.5, np.nan])
+    text = format_price(values)
+    assert text[0] == "1\u00a0000\u00a0000,13 грн." and text[1] == "-3,50 грн."
+    parsed = parse_number_block(pd.DataFrame({"цена": text}))["цена"].to_numpy()
+    np.testing.assert_allclose(parsed, values)
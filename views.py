@@ -0,0 +1,512 @@
+import json
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+
+from aggregates import candidate_mask, growth_candidates, scenario_totals, simulate_prices
+from filters import select_positions, subcategory_options, supplier_options
+from loader import (
+    load_filter_index, load_range_index, load_sales_dynamics, load_search_index, load_streamed_aggregates, load_summary,
+)
+from profiling import collect, records
+from ranges import group_range_totals, range_metrics
+from search import search_positions
+from table import paginated_dataframe
+
+# ========================
+# вкладки
+# ========================
+
+# Каждая вкладка — отдельный фрагмент: взаимодействие с её виджетами
+# перезапускает только эту вкладку, а не всё приложение. Такой перезапуск не
+# проходит через begin_run и боковую панель, поэтому этапы вкладки хранятся в
+# session_state по её имени, а при включённой диагностике вкладка показывает
+# их сама — с замерами последнего клика.
+
+
+def profiled_view(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with collect(name) as stages:
+                result = func(*args, **kwargs)
+            # последняя выполненная вкладка — в конце словаря
+            view_stages = st.session_state.setdefault("view_stages", {})
+            view_stages.pop(name, None)
+            view_stages[name] = stages
+            if st.session_state.get("diagnostics") and stages:
+                with st.expander("🩺 Замеры вкладки"):
+                    st.dataframe(_stage_table(stages), hide_index=True)
+            return result
+        return wrapper
+    return decorator
+
+
+def _reset_pages(*keys):
+    for key in keys:
+        st.session_state[key] = 1
+
+
+@st.fragment
+@profiled_view("view:prices")
+def prices_view(df):
+    st.title("📈 Анализ изменения цен")
+
+    if df is None:
+        st.info("Выгрузка обрабатывается потоково — построчный просмотр недоступен.")
+        streamed_monthly_section()
+        return
+
+    if "subcategory" not in df.columns:
+        st.error("Колонка 'subcategory' не найдена.")
+        return
+
+    index = load_filter_index(df)
+
+    # Добавляем "Все" в список подкатегорий
+    subcat_options = ["Все"] + subcategory_options(index)
+    selected_subcat = st.selectbox("Подкатегория", subcat_options)
+    subcategory = None if selected_subcat == "Все" else selected_subcat
+
+    supplier = None
+    if "Поставщик" in df.columns:
+        supplier_list = ["Все"] + supplier_options(index, subcategory)
+        selected_supplier = st.selectbox("Поставщик", supplier_list)
+        supplier = None if selected_supplier == "Все" else selected_supplier
+
+    query = st.text_input(
+        "Поиск товара", placeholder="название или артикул", key="prices_query",
+        on_change=_reset_pages, args=("prices_page", "prices_period_page"),
+    )
+
+    months = load_range_index(df)["months"]
+    start, end = months[0], months[-1]
+    if len(months) > 1:
+        start, end = st.select_slider("Период", months, value=(start, end), key="prices_months")
+
+    expected_cols = [
+        "Артикул", 
+        "Поставщик",
+        "title", 
+        "subcategory",
+        "Первая цена за период", 
+        "Последняя цена за период", 
+        "Изменение цены в гривнах", 
+        "Изменение цены %",
+        "Общее количество продаж (шт)"
+    ]
+    available_cols = [col for col in expected_cols if col in df.columns]
+
+    # строки берутся по готовым позициям — только нужные колонки и строки
+    positions = select_positions(index, subcategory, supplier)
+    if query.strip():
+        # найденные строки в порядке релевантности, внутри выбранных фильтров
+        positions = search_positions(load_search_index(df), query, positions)
+        st.caption(f"Найдено товаров: {len(positions)}")
+
+    if (start, end) != (months[0], months[-1]):
+        # за часть периода цены и продажи пересчитываются по накопленным суммам
+        metrics = range_metrics(load_range_index(df), start, end, positions)
+        identity = [col for col in ["Артикул", "Поставщик", "title", "subcategory"] if col in df.columns]
+        frame = pd.concat([df[identity].iloc[metrics.index].set_axis(metrics.index), metrics], axis=1)
+        paginated_dataframe(frame, "prices_period", searchable=False)
+    elif not available_cols:
+        st.warning("В выбранных фильтрах нет нужных колонок для анализа.")
+    else:
+        paginated_dataframe(df, "prices", columns=available_cols, positions=positions, searchable=False)
+
+
+elasticity_options = [0.0, -0.5, -1.0, -1.5, -2.0]
+
+
+def price_scenarios(summary, key, rename):
+    # кандидаты на повышение цен и перебор сценариев: сетка повышений
+    # и эластичностей считается одним вызовом simulate_prices
+    with st.expander("⚙️ Параметры сценариев"):
+        col1, col2 = st.columns(2)
+        min_items = col1.number_input("Товаров в группе больше", min_value=0, value=5, key=f"{key}_min_items")
+        max_change = col2.number_input("Средний рост цен меньше, %", value=1.0, step=0.5, key=f"{key}_max_change")
+        low, high = st.slider("Повышение цен, %", 1, 50, (1, 20), key=f"{key}_range")
+        elasticities = st.multiselect(
+            "Эластичность спроса (0 — продажи не меняются)",
+            elasticity_options, default=[0.0, -1.0], key=f"{key}_elasticity",
+        ) or [0.0]
+
+    uplifts = list(range(low, high + 1))
+    col1, col2 = st.columns([3, 1])
+    uplift = col1.select_slider(
+        "Сценарий для таблицы, %", uplifts, value=10 if 10 in uplifts else uplifts[-1], key=f"{key}_uplift"
+    )
+    elasticity = col2.selectbox("Эластичность для таблицы", elasticities, key=f"{key}_table_elasticity")
+
+    candidates = growth_candidates(summary, min_items, uplift, max_change, elasticity).rename(columns=rename)
+    st.dataframe(candidates)
+
+    total_gain = candidates[f"Потенциал роста при +{uplift:g}%"].sum()
+    st.markdown(f"💰 Потенциальная суммарная прибавка к выручке: `{total_gain:,.0f} грн`")
+
+    totals = scenario_totals(simulate_prices(summary[candidate_mask(summary, min_items, max_change)], uplifts, elasticities))
+    totals["Эластичность"] = totals["Эластичность"].astype(str)
+    col1, col2 = st.columns(2)
+    for col, value in ((col1, "Прирост выручки"), (col2, "Прирост прибыли")):
+        fig = px.line(
+            totals,
+            x="Повышение цены %",
+            y=value,
+            color="Эластичность",
+            markers=True,
+            labels={value: "грн"},
+            title=f"{value} по сценариям",
+        )
+        col.plotly_chart(fig, width="stretch")
+
+
+def period_totals_section(df, by, key):
+    # продажи по группам за выбранный диапазон месяцев
+    if df is None:
+        return
+
+    ranges = load_range_index(df)
+    months = ranges["months"]
+    if by not in ranges["groups"] or len(months) < 2:
+        return
+
+    st.markdown("### 🗓️ Продажи за период")
+    start, end = st.select_slider("Период", months, value=(months[0], months[-1]), key=key)
+    totals = group_range_totals(ranges, by, start, end).sort_values("Выручка за период", ascending=False)
+    paginated_dataframe(totals, f"{key}_table")
+
+    fig = px.bar(
+        totals.head(20),
+        x=by,
+        y="Выручка за период",
+        labels={"Выручка за период": "грн"},
+        title=f"💰 Выручка {start} – {end}",
+    )
+    st.plotly_chart(fig, width="stretch")
+
+
+def streamed_monthly_section():
+    # помесячные итоги по всей выгрузке, собранные тем же потоковым проходом
+    monthly = load_streamed_aggregates()["monthly"]
+    if monthly.empty:
+        return
+
+    st.markdown("### 🗓️ Продажи по месяцам")
+    st.dataframe(monthly.rename(columns={"month": "Месяц", "quantity": "Продано (шт)", "revenue": "Выручка"}))
+
+    fig = px.line(monthly, x="month", y="revenue", labels={"month": "Месяц", "revenue": "грн"}, title="💰 Выручка по месяцам")
+    st.plotly_chart(fig, width="stretch")
+
+
+def sales_dynamics_section(df, by):
+    # тренд/волатильность считаются по помесячному блоку — в потоковом
+    # режиме и для старых снапшотов без этих колонок раздел не показывается
+    if df is None or "Тренд продаж (recalc)" not in df.columns:
+        return
+
+    st.markdown("### 📈 Динамика продаж")
+    dynamics = load_sales_dynamics(by, df)
+    st.dataframe(dynamics)
+
+    fig = px.bar(
+        dynamics.sort_values("Тренд продаж группы", ascending=False),
+        x=by,
+        y="Тренд продаж группы",
+        color="Волатильность группы",
+        labels={"Тренд продаж группы": "шт/мес"},
+        title="Тренд продаж (наклон по месяцам)",
+    )
+    st.plotly_chart(fig, width="stretch")
+
+
+@st.fragment
+@profiled_view("view:subcategory_summary")
+def subcategory_summary_view(df):
+    st.title("📊 Итоги по подкатегориям")
+
+    df_summary = load_summary("subcategory", df)
+
+    paginated_dataframe(df_summary, "subcategory_summary")
+
+    fig2 = px.bar(
+        df_summary.sort_values("Общая прибыль", ascending=False),
+        x="subcategory",
+        y="Общая прибыль",
+        title="📦 Прибыль по подкатегориям",
+        labels={"Общая прибыль": "грн"},
+    )
+    st.plotly_chart(fig2, width="stretch")
+
+    period_totals_section(df, "subcategory", "subcategory_period")
+
+
+@st.fragment
+@profiled_view("view:subcategory_dynamics")
+def subcategory_dynamics_view(df):
+    st.title("Динамика цен по подкатегориям")
+
+    summary = load_summary("subcategory", df)
+    df_grouped = summary[[
+        "subcategory",
+        "Среднее_изменение_цены_проц",
+        "Макс_рост_цены_грн",
+        "Мин_падение_цены_грн",
+        "Товаров",
+    ]].rename(columns={"Товаров": "Товаров_в_подкатегории"})
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Средний рост цен", f"{df_grouped['Среднее_изменение_цены_проц'].mean():.2f}%")
+    col2.metric("Макс. рост цены (грн)", f"{df_grouped['Макс_рост_цены_грн'].max():.2f} грн")
+    col3.metric("Мин. падение цены (грн)", f"{df_grouped['Мин_падение_цены_грн'].min():.2f} грн")
+
+    st.markdown("### 📋 Подробности по подкатегориям")
+    st.dataframe(df_grouped)
+
+    st.markdown("### Подкатегории с падением или отсутствием роста цен")
+    price_scenarios(summary, "subcategory_scenarios", {"Товаров": "Товаров_в_подкатегории"})
+
+    fig3 = px.bar(
+        df_grouped.sort_values("Среднее_изменение_цены_проц", ascending=False),
+        x="subcategory",
+        y="Среднее_изменение_цены_проц",
+        labels={"Среднее_изменение_цены_проц": "Средний рост, %"},
+        title="📊 Среднее изменение цены по подкатегориям",
+    )
+    st.plotly_chart(fig3, width="stretch")
+
+    st.markdown("### 🔼 Топ-5 подкатегорий по росту цен")
+    fig4 = px.bar(
+        df_grouped.sort_values("Среднее_изменение_цены_проц", ascending=False).head(5),
+        x="subcategory",
+        y="Среднее_изменение_цены_проц",
+        color="Среднее_изменение_цены_проц",
+        labels={"Среднее_изменение_цены_проц": "%"},
+    )
+    st.plotly_chart(fig4, width="stretch")
+
+    st.markdown("### 🔽 Топ-5 подкатегорий по снижению цен")
+    fig5 = px.bar(
+        df_grouped.sort_values("Среднее_изменение_цены_проц", ascending=True).head(5),
+        x="subcategory",
+        y="Среднее_изменение_цены_проц",
+        color="Среднее_изменение_цены_проц",
+        labels={"Среднее_изменение_цены_проц": "%"},
+    )
+    st.plotly_chart(fig5, width="stretch")
+
+    sales_dynamics_section(df, "subcategory")
+
+
+@st.fragment
+@profiled_view("view:vendor_summary")
+def vendor_summary_view(df):
+    st.title("📋 Анализ по поставщикам")
+
+    df_summary = load_summary("Поставщик", df)
+
+    paginated_dataframe(df_summary, "vendor_summary")
+
+    period_totals_section(df, "Поставщик", "vendor_period")
+
+
+# with tab4:
+#     st.title("📦 Итоги по поставщикам")
+
+#     try:
+#         df_sup = pd.read_csv("Summar - Общая сводная.csv", sep=",", dtype=str)
+
+#         def parse_price(val):
+#             try:
+#                 return float(str(val).replace("грн.", "").replace(",", ".").replace(" ", "").strip())
+#             except:
+#                 return None
+
+#         df_sup["Итого продаж"] = df_sup["Итого продаж"].apply(parse_price)
+#         df_sup["Средняя цена продажи"] = df_sup["Средняя цена продажи"].apply(parse_price)
+#         df_sup["закупочная цена"] = df_sup["закупочная цена"].apply(parse_price)
+
+#         df_sup = df_sup.dropna(subset=["Поставщик"])
+        
+#         grouped_suppliers = df_sup.groupby("Поставщик").agg(
+#             Товаров=("Артикул", "count"),
+#             Сумма_продаж=("Итого продаж", "sum"),
+#             Средняя_цена_продажи=("Средняя цена продажи", "mean"),
+#             Средняя_закупка=("закупочная цена", "mean"),
+#         ).reset_index()
+
+#         grouped_suppliers["Средняя_маржа"] = (
+#             grouped_suppliers["Средняя_цена_продажи"] - grouped_suppliers["Средняя_закупка"]
+#         ).round(2)
+
+#         selected_vendor = st.selectbox("Выберите поставщика", df_sup["Поставщик"].unique())
+#         st.dataframe(df_sup[df_sup["Поставщик"] == selected_vendor])
+
+#         st.markdown("### Топ-20 поставщиков по выручке")
+#         st.dataframe(grouped_suppliers.sort_values("Сумма_продаж", ascending=False))
+
+
+#         st.markdown("### Топ-10 поставщиков по средней марже")
+#         fig_margins = px.bar(
+#             grouped_suppliers.sort_values("Средняя_маржа", ascending=False).head(10),
+#             x="Поставщик",
+#             y="Средняя_маржа",
+#             title="🏆 Средняя маржа по поставщикам",
+#             labels={"Средняя_маржа": "грн"},
+#         )
+#         st.plotly_chart(fig_margins)
+        
+#         fig_supplier_profit = px.bar(
+#             grouped_suppliers.sort_values("Сумма_продаж", ascending=False).head(20),
+#             x="Поставщик",
+#             y="Сумма_продаж",
+#             title="💰 Топ-20 поставщиков по выручке",
+#             labels={"Сумма_продаж": "грн"},
+#         )
+#         st.plotly_chart(fig_supplier_profit)
+
+#     except Exception as e:
+#         st.error(f"Ошибка при обработке данных по поставщикам: {e}")
+
+
+@st.fragment
+@profiled_view("view:vendor_analysis")
+def vendor_analysis_view(df):
+    st.title("📋 Анализ по поставщикам")
+
+    if df is not None and "Поставщик" not in df.columns:
+        st.warning("Нет данных по поставщикам.")
+        return
+
+    summary = load_summary("Поставщик", df)
+    df_vendor_grouped = summary[[
+        "Поставщик",
+        "Среднее_изменение_цены_проц",
+        "Макс_рост_цены_грн",
+        "Мин_падение_цены_грн",
+        "Товаров",
+    ]].rename(columns={"Товаров": "Товаров_у_поставщика"})
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Средний рост цен у поставщиков", f"{df_vendor_grouped['Среднее_изменение_цены_проц'].mean():.2f}%")
+    col2.metric("Макс. рост цены (грн)", f"{df_vendor_grouped['Макс_рост_цены_грн'].max():.2f} грн")
+    col3.metric("Мин. падение цены (грн)", f"{df_vendor_grouped['Мин_падение_цены_грн'].min():.2f} грн")
+
+    st.markdown("### 📋 Подробности по поставщикам")
+    st.dataframe(df_vendor_grouped)
+
+    st.markdown("### 📈 Поставщики с возможным ростом")
+    price_scenarios(summary, "vendor_scenarios", {"Товаров": "Товаров_у_поставщика"})
+
+    st.markdown("### 🔼 Топ-5 поставщиков по росту цен")
+    fig_vendor_up = px.bar(
+        df_vendor_grouped.sort_values("Среднее_изменение_цены_проц", ascending=False).head(5),
+        x="Поставщик",
+        y="Среднее_изменение_цены_проц",
+        color="Среднее_изменение_цены_проц",
+        labels={"Среднее_изменение_цены_проц": "%"},
+    )
+    st.plotly_chart(fig_vendor_up, width="stretch")
+
+    st.markdown("### 🔽 Топ-5 поставщиков по падению цен")
+    fig_vendor_down = px.bar(
+        df_vendor_grouped.sort_values("Среднее_изменение_цены_проц", ascending=True).head(5),
+        x="Поставщик",
+        y="Среднее_изменение_цены_проц",
+        color="Среднее_изменение_цены_проц",
+        labels={"Среднее_изменение_цены_проц": "%"},
+    )
+    st.plotly_chart(fig_vendor_down, width="stretch")
+
+    sales_dynamics_section(df, "Поставщик")
+
+
+# with tab6:
+#     st.title("📋 Анализ по поставщикам")
+
+#     def clean_price_column(series):
+#         return (
+#             series.astype(str)
+#             .str.replace(",", ".", regex=False)
+#             .str.replace(r"[^\d\.]", "", regex=True)
+#             .replace("", float("nan"))
+#             .astype(float)
+#         )
+
+#     df["Средняя цена продажи"] = clean_price_column(df["Средняя цена продажи"])
+#     df["закупочная цена"] = clean_price_column(df["закупочная цена"])
+
+#     col1, col2, col3 = st.columns(3)
+#     col1.metric("Всего уникальных товаров", df["Артикул"].nunique())
+#     col2.metric("Средняя цена продажи", f"{df['Средняя цена продажи'].mean():.2f} грн")
+
+#     st.markdown("### 📦 Количество товаров по категориям")
+#     category_counts = df["category"].value_counts().reset_index()
+#     category_counts.columns = ["Категория", "Количество"]
+
+#     fig_category = px.bar(
+#         category_counts.sort_values("Количество", ascending=False),
+#         x="Категория",
+#         y="Количество",
+#         title="Количество товаров по категориям",
+#     )
+#     st.plotly_chart(fig_category, use_container_width=True)
+
+#     st.markdown("### 💰 Средняя закупочная vs. продажная цена по подкатегориям")
+#     by_subcat = df.groupby("subcategory").agg(
+#         Средняя_цена_продажи=("Средняя цена продажи", "mean"),
+#         Средняя_закупка=("закупочная цена", "mean")
+#     ).dropna().round(2).reset_index()
+
+#     fig_prices = px.bar(
+#         by_subcat.melt(id_vars="subcategory", value_vars=["Средняя_цена_продажи", "Средняя_закупка"]),
+#         x="subcategory",
+#         y="value",
+#         color="variable",
+#         title="Средняя цена продажи vs. закупочная по подкатегориям",
+#         labels={"value": "Цена", "subcategory": "Подкатегория", "variable": "Тип"},
+#         barmode="group"
+#     )
+#     st.plotly_chart(fig_prices, use_container_width=True)
+
+#     st.markdown("### 🏆 Топ-10 товаров по объему продаж")
+#     top_sales = df[["title", "Итого продаж"]].dropna().sort_values("Итого продаж", ascending=False).head(10)
+
+#     fig_top_products = px.bar(
+#         top_sales,
+#         x="title",
+#         y="Итого продаж",
+#         title="Топ-10 товаров по продажам",
+#         labels={"Итого продаж": "грн", "title": "Товар"}
+#     )
+#     st.plotly_chart(fig_top_products, use_container_width=True)
+
+
+def _stage_table(stages):
+    table = pd.DataFrame(stages)
+    table["stage"] = ["  " * depth + name for depth, name in zip(table["depth"], table["stage"])]
+    return table[["stage", "seconds", "rows", "memory_delta_mb", "cache"]]
+
+
+def diagnostics_panel():
+    # этапы последнего полного прогона и открытой в нём вкладки
+    if not st.sidebar.toggle("🩺 Диагностика", key="diagnostics"):
+        return
+
+    views = list(st.session_state.get("view_stages", {}).values())
+    stages = records() + (views[-1] if views else [])
+    if not stages:
+        st.sidebar.caption("Замеры отключены (STATISTIC_PROFILING=0).")
+        return
+
+    total = sum(stage["seconds"] for stage in stages if stage["depth"] == 0)
+    st.sidebar.metric("Время прогона", f"{total:.3f} s")
+    st.sidebar.dataframe(_stage_table(stages), hide_index=True)
+    st.sidebar.download_button(
+        "Скачать замеры (JSON Lines)",
+        "\n".join(json.dumps(stage, ensure_ascii=False) for stage in stages),
+        file_name="profiling.jsonl",
+        mime="application/json",
+    )